@@ -190,16 +190,15 @@ def main():
                             for msg in st.session_state.messages[:-1]  # Excluir a pergunta atual
                         ]
                         
-                        # Fazer pergunta com contexto conversacional e imagem (se houver)
-                        response = chatbot.ask(
+                        # Fazer pergunta com contexto conversacional e imagem (se houver),
+                        # exibindo a resposta conforme os tokens chegam
+                        response = st.write_stream(chatbot.ask_stream(
                             prompt, 
                             image_data=image_data,
                             chat_history=chat_history if chat_history else None
-                        )
+                        ))
                         sources = chatbot.get_sources(prompt)
                         
-                        st.markdown(response)
-                        
                         # Adicionar resposta ao histórico com fontes
                         st.session_state.messages.append({
                             "role": "assistant",
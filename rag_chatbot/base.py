@@ -5,8 +5,11 @@ enabling modular, composable, and testable RAG pipelines.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
-from rag_chatbot.interfaces import Documento
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from rag_chatbot.interfaces import Documento, RetrievalResult
 
 
 class BaseComponent(ABC):
@@ -90,6 +93,22 @@ class BaseRetriever(BaseComponent):
         """
         pass
     
+    def retrieve_with_scores(self, query_text: str, top_k: int = 10) -> RetrievalResult:
+        """Retrieve relevant documents together with their retrieval scores.
+        
+        The default calls `retrieve` and fills the scores with NaN;
+        retrievers that compute a similarity should override this method.
+        
+        Args:
+            query_text: Search query.
+            top_k: Number of documents to retrieve.
+        
+        Returns:
+            RetrievalResult with the documents and their scores.
+        """
+        documents = self.retrieve(query_text, top_k=top_k)
+        return RetrievalResult(documents, np.full(len(documents), np.nan, dtype=np.float32))
+    
     def run(self, data, **kwargs):
         """Execute retrieval operation.
         
@@ -154,6 +173,30 @@ class BaseGenerator(BaseComponent):
         """
         pass
     
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Generate text from a prompt, yielding it in chunks.
+        
+        The default implementation yields the full response at once;
+        generators backed by a streaming API should override it.
+        
+        Args:
+            prompt: Input prompt.
+            **kwargs: Generation parameters.
+            
+        Yields:
+            Chunks of generated text, in order.
+        """
+        yield self.generate(prompt, **kwargs)
+    
+    def warmup(self) -> None:
+        """Prepare the generator for an upcoming request.
+        
+        Called by `Pipeline.arun` while retrieval is still running, so
+        slow setup (loading the model, opening a connection) overlaps
+        with it. The default implementation does nothing.
+        """
+        pass
+    
     def run(self, data, **kwargs):
         """Execute generation operation.
         
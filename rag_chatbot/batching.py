@@ -0,0 +1,229 @@
+"""Dynamic batching of query embeddings.
+
+Under concurrent load (e.g. several users asking at once) every `ask`
+embeds its question separately, so the embedding model runs many tiny
+forward passes. `BatchingEmbedder` wraps any `IEmbeddingModel` and
+coalesces concurrent `embed_query` calls into a single
+`embed_documents` call. Queries are grouped in buckets by approximate
+token length, so short and long queries are not padded to the same size.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from rag_chatbot.interfaces import IEmbeddingModel
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingQuery:
+    """A query waiting in a bucket for its embedding."""
+    
+    __slots__ = ("text", "enqueued_at", "done", "result", "error")
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.enqueued_at = time.monotonic()
+        self.done = threading.Event()
+        self.result: Optional[np.ndarray] = None
+        self.error: Optional[BaseException] = None
+
+
+class BatchingEmbedder(IEmbeddingModel):
+    """Embedding model wrapper that batches concurrent queries.
+    
+    A background worker flushes a bucket as soon as it holds
+    `max_batch_size` queries, or when its oldest query has waited
+    `max_wait` seconds. A single caller therefore pays at most
+    `max_wait` of extra latency.
+    
+    Attributes:
+        BUCKET_SIZES: Upper bounds (in approximate tokens) of the length buckets.
+        WORKER_CHECK_INTERVAL: Seconds between checks, while a caller waits,
+            that the worker thread is still alive.
+    """
+    
+    BUCKET_SIZES = (16, 32, 64, 128, 256, 512)
+    WORKER_CHECK_INTERVAL = 1.0
+    
+    def __init__(
+        self,
+        embedder: IEmbeddingModel,
+        max_batch_size: int = 32,
+        max_wait: float = 0.005,
+    ):
+        """Initialize the batcher and start its worker thread.
+        
+        Args:
+            embedder: Embedding model that does the actual work.
+            max_batch_size: Maximum number of queries per forward pass.
+            max_wait: Seconds a query may wait for others to join its batch.
+        """
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        
+        self._buckets: Dict[int, List[_PendingQuery]] = {size: [] for size in self.BUCKET_SIZES}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._worker = threading.Thread(
+            target=self._run, name="BatchingEmbedder", daemon=True
+        )
+        self._worker.start()
+        
+        logger.info(f"BatchingEmbedder started (max_batch_size={max_batch_size}, "
+                    f"max_wait={max_wait * 1000:.1f}ms)")
+    
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Embed a list of texts directly (it is already a batch).
+        
+        Args:
+            texts: Texts to embed.
+        
+        Returns:
+            Matrix of shape (N, D).
+        """
+        return self.embedder.embed_documents(texts)
+    
+    def embed_query(self, text: str) -> np.ndarray:
+        """Embed a query, sharing the forward pass with concurrent callers.
+        
+        Args:
+            text: Query text.
+        
+        Returns:
+            Read-only vector of shape (D,) (a view of the shared batch
+            matrix); use `.copy()` to modify it.
+        
+        Raises:
+            RuntimeError: If the batcher has been closed or its worker stopped.
+        """
+        pending = _PendingQuery(text)
+        
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("BatchingEmbedder is closed")
+            self._buckets[self._bucket_for(text)].append(pending)
+            self._condition.notify()
+        
+        while not pending.done.wait(self.WORKER_CHECK_INTERVAL):
+            if not self._worker.is_alive() and not pending.done.is_set():
+                raise RuntimeError("BatchingEmbedder worker stopped")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+    
+    def close(self):
+        """Flush pending queries and stop the worker thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join()
+    
+    def _bucket_for(self, text: str) -> int:
+        """Pick the smallest bucket that fits the text's approximate token count.
+        
+        Args:
+            text: Query text.
+        
+        Returns:
+            Bucket size key.
+        """
+        # ~4 characters per token is close enough to group similar lengths
+        approx_tokens = len(text) // 4 + 1
+        index = bisect.bisect_left(self.BUCKET_SIZES, approx_tokens)
+        return self.BUCKET_SIZES[min(index, len(self.BUCKET_SIZES) - 1)]
+    
+    def _next_batch(self) -> Optional[List[_PendingQuery]]:
+        """Block until a bucket is ready to flush and take its queries.
+        
+        Returns:
+            The queries to embed, or None once closed and drained.
+        """
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                waiting = {size: queue for size, queue in self._buckets.items() if queue}
+                
+                # Fullest full bucket first, otherwise the stalest expired one
+                full = [size for size, queue in waiting.items() if len(queue) >= self.max_batch_size]
+                expired = [
+                    size for size, queue in waiting.items()
+                    if self._closed or queue[0].enqueued_at + self.max_wait <= now
+                ]
+                if full:
+                    ready = max(full, key=lambda size: len(waiting[size]))
+                elif expired:
+                    ready = min(expired, key=lambda size: waiting[size][0].enqueued_at)
+                else:
+                    ready = None
+                
+                if ready is not None:
+                    queue = self._buckets[ready]
+                    batch = queue[:self.max_batch_size]
+                    del queue[:self.max_batch_size]
+                    return batch
+                
+                if self._closed:
+                    return None
+                
+                # Sleep until the oldest waiting query hits its deadline
+                timeout = None
+                if waiting:
+                    oldest = min(queue[0].enqueued_at for queue in waiting.values())
+                    timeout = oldest + self.max_wait - now
+                self._condition.wait(timeout)
+    
+    def _run(self):
+        """Worker loop: embed ready batches until closed.
+        
+        However the loop exits, queries still waiting are failed so their
+        callers never block forever.
+        """
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+                self._embed_batch(batch)
+        finally:
+            with self._condition:
+                self._closed = True
+                stranded = [pending for queue in self._buckets.values() for pending in queue]
+                for queue in self._buckets.values():
+                    queue.clear()
+            for pending in stranded:
+                pending.error = RuntimeError("BatchingEmbedder worker stopped")
+                pending.done.set()
+    
+    def _embed_batch(self, batch: List[_PendingQuery]):
+        """Embed one batch and hand each caller its row (or the error).
+        
+        Args:
+            batch: Queries to embed together.
+        """
+        try:
+            embeddings = np.array(
+                self.embedder.embed_documents([pending.text for pending in batch]),
+                dtype=np.float32
+            )
+            # Rows are views of one matrix shared by all callers
+            embeddings.flags.writeable = False
+            for pending, embedding in zip(batch, embeddings):
+                pending.result = embedding
+        except Exception as e:
+            logger.error(f"Batched embedding failed: {e}")
+            for pending in batch:
+                pending.error = e
+        finally:
+            for pending in batch:
+                if pending.result is None and pending.error is None:
+                    pending.error = RuntimeError("BatchingEmbedder worker stopped")
+                pending.done.set()
+        
+        logger.debug("Embedded batch of %d queries", len(batch))
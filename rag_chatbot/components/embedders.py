@@ -1,8 +1,10 @@
 """Implementações de Embedding Models."""
 
+import functools
 import logging
 from typing import List
 
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
 from rag_chatbot.interfaces import IEmbeddingModel
@@ -17,38 +19,63 @@ class MiniLMEmbedder(IEmbeddingModel):
     Usa o modelo all-MiniLM-L6-v2 por padrão, que é leve e eficiente.
     """
     
-    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL):
+    caches_queries = True
+    
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL, query_cache_size: int = 1024):
         """Inicializa o modelo de embedding.
         
         Args:
             model_name: Nome do modelo SentenceTransformer a usar.
+            query_cache_size: Número de queries cujo embedding fica em cache
+                (0 desativa o cache).
         """
         logger.info(f"Carregando modelo de embedding: {model_name}")
         self.model = SentenceTransformer(model_name)
         logger.info("Modelo de embedding carregado com sucesso.")
+        
+        # Cache LRU por instância: queries repetidas (retries, reformulações
+        # no chat) não passam de novo pelo transformer
+        self._embed_query_cached = functools.lru_cache(maxsize=query_cache_size)(
+            self._encode_query
+        )
+        self.caches_queries = query_cache_size != 0
     
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
         """Gera embeddings para uma lista de textos.
         
         Args:
             texts: Lista de textos para embedar.
             
         Returns:
-            Lista de vetores de embedding.
+            Matriz float32 de shape (N, D).
         """
-        logger.debug(f"Gerando embeddings para {len(texts)} documentos.")
+        logger.debug("Gerando embeddings para %d documentos.", len(texts))
         embeddings = self.model.encode(texts)
-        return embeddings.tolist()
+        # O SentenceTransformer já devolve float32, então não há cópia
+        return np.asarray(embeddings, dtype=np.float32)
     
-    def embed_query(self, text: str) -> List[float]:
+    def embed_query(self, text: str) -> np.ndarray:
         """Gera embedding para uma única query.
         
         Args:
             text: Texto da query.
             
         Returns:
-            Vetor de embedding.
+            Vetor float32 de shape (D,). O array é somente leitura porque
+            pode ser compartilhado pelo cache; use `.copy()` para alterá-lo.
+        """
+        return self._embed_query_cached(text)
+    
+    def _encode_query(self, text: str) -> np.ndarray:
+        """Executa o modelo para uma query (chamado apenas em cache miss).
+        
+        Args:
+            text: Texto da query.
+            
+        Returns:
+            Vetor de embedding somente leitura (seguro para o cache).
         """
-        logger.debug(f"Gerando embedding para query: {text[:50]}...")
-        embedding = self.model.encode([text])[0]
-        return embedding.tolist()
+        logger.debug("Gerando embedding para query: %.50s...", text)
+        embedding = np.array(self.model.encode([text])[0], dtype=np.float32)
+        embedding.flags.writeable = False
+        return embedding
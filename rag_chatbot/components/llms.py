@@ -1,7 +1,7 @@
 """Implementações de Local LLMs."""
 
 import logging
-from typing import Optional, List
+from typing import Optional, List, Iterator, Dict, Any
 
 try:
     import ollama
@@ -58,45 +58,96 @@ class OllamaLLM(ILocalLLM):
             logger.warning(f"Não foi possível verificar conexão com Ollama: {e}")
             logger.warning("Certifique-se de que o Ollama está rodando.")
     
-    def generate(self, prompt: str, images_base64: List[str] = None) -> str:
-        """Gera texto a partir de um prompt.
+    def _build_params(
+        self,
+        prompt: str,
+        images_base64: Optional[List[str]],
+        system: Optional[str],
+        stream: bool
+    ) -> Dict[str, Any]:
+        """Monta os parâmetros da chamada `client.generate`.
         
         Args:
             prompt: O prompt para geração.
-            images_base64: Lista de imagens em base64 (opcional, para modelos multimodais).
+            images_base64: Lista de imagens em base64 (opcional).
+            system: Instrução de sistema (opcional).
+            stream: Se a resposta deve vir em pedaços.
             
         Returns:
-            Texto gerado pelo modelo.
+            Parâmetros para o cliente Ollama.
         """
         # Escolher modelo baseado na presença de imagens
         if images_base64:
             model_to_use = self.multimodal_model_name
-            logger.debug(f"Gerando resposta com modelo multimodal {model_to_use}")
+            logger.debug("Gerando resposta com modelo multimodal %s", model_to_use)
         else:
             model_to_use = self.model_name
-            logger.debug(f"Gerando resposta com modelo {model_to_use}")
+            logger.debug("Gerando resposta com modelo %s", model_to_use)
         
-        try:
-            # Preparar parâmetros para a chamada
-            params = {
-                "model": model_to_use,
-                "prompt": prompt,
-                "stream": False
-            }
-            
-            # Adicionar imagens se fornecidas
-            if images_base64:
-                params["images"] = images_base64
+        params = {
+            "model": model_to_use,
+            "prompt": prompt,
+            "stream": stream
+        }
+        
+        # Adicionar imagens se fornecidas
+        if images_base64:
+            params["images"] = images_base64
+        
+        if system:
+            params["system"] = system
+        
+        return params
+    
+    def generate(self, prompt: str, images_base64: List[str] = None, system: Optional[str] = None) -> str:
+        """Gera texto a partir de um prompt.
+        
+        Args:
+            prompt: O prompt para geração.
+            images_base64: Lista de imagens em base64 (opcional, para modelos multimodais).
+            system: Instrução de sistema (opcional), enviada no campo `system` do Ollama.
             
+        Returns:
+            Texto gerado pelo modelo.
+        """
+        try:
+            params = self._build_params(prompt, images_base64, system, stream=False)
             response = self.client.generate(**params)
             
             generated_text = response['response']
-            logger.debug(f"Resposta gerada com sucesso ({len(generated_text)} caracteres).")
+            logger.debug("Resposta gerada com sucesso (%d caracteres).", len(generated_text))
             return generated_text
             
         except Exception as e:
             logger.error(f"Erro na geração do LLM: {e}")
             return f"Erro ao contatar o LLM: {str(e)}"
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        images_base64: List[str] = None,
+        system: Optional[str] = None
+    ) -> Iterator[str]:
+        """Gera texto a partir de um prompt, repassando os tokens do Ollama.
+        
+        Args:
+            prompt: O prompt para geração.
+            images_base64: Lista de imagens em base64 (opcional, para modelos multimodais).
+            system: Instrução de sistema (opcional).
+            
+        Yields:
+            Pedaços do texto gerado, conforme chegam do servidor.
+        """
+        try:
+            params = self._build_params(prompt, images_base64, system, stream=True)
+            for chunk in self.client.generate(**params):
+                text = chunk['response']
+                if text:
+                    yield text
+            
+        except Exception as e:
+            logger.error(f"Erro na geração do LLM: {e}")
+            yield f"Erro ao contatar o LLM: {str(e)}"
 
 
 class MockLLM(ILocalLLM):
@@ -114,12 +165,13 @@ class MockLLM(ILocalLLM):
         self.default_response = default_response
         logger.info("Mock LLM inicializado (para testes).")
     
-    def generate(self, prompt: str, images_base64: List[str] = None) -> str:
+    def generate(self, prompt: str, images_base64: List[str] = None, system: Optional[str] = None) -> str:
         """Retorna uma resposta mock.
         
         Args:
             prompt: O prompt (ignorado no mock).
             images_base64: Imagens (ignoradas no mock).
+            system: Instrução de sistema (ignorada no mock).
             
         Returns:
             Resposta mock.
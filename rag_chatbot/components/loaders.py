@@ -1,7 +1,10 @@
 """Implementações de Document Loaders."""
 
+import io
 import logging
-import glob
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List
 
@@ -9,13 +12,31 @@ from rag_chatbot.interfaces import IDocumentLoader, Documento
 
 logger = logging.getLogger(__name__)
 
+# PyMuPDF não é thread-safe: a extração de PDFs é serializada por este lock,
+# enquanto arquivos de texto e DOCX continuam sendo lidos em paralelo.
+_PDF_LOCK = threading.Lock()
+
 
 class UniversalLoader(IDocumentLoader):
     """Carrega documentos de múltiplos formatos de uma pasta.
     
     Suporta: .txt, .md, .pdf, .docx
+    
+    Os arquivos são lidos em paralelo por um pool de threads (leitura de
+    disco e parsing de DOCX liberam o GIL boa parte do tempo).
     """
     
+    def __init__(self, max_workers: int = None):
+        """Inicializa o loader.
+        
+        Args:
+            max_workers: Número máximo de threads de leitura
+                (None = min(32, 4 × núcleos)).
+        """
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) * 4)
+        self.max_workers = max_workers
+    
     def load(self, source: str) -> List[Documento]:
         """Carrega arquivos de múltiplos formatos de uma pasta.
         
@@ -26,20 +47,46 @@ class UniversalLoader(IDocumentLoader):
             Lista de documentos carregados.
         """
         logger.info(f"Carregando arquivos de {source}")
-        documentos = []
         
-        # Padrões de arquivo suportados
-        patterns = {
-            "*.txt": self._load_text,
-            "*.md": self._load_text,
-            "*.pdf": self._load_pdf,
-            "*.docx": self._load_docx,
+        # Extensões suportadas
+        loaders_by_suffix = {
+            ".txt": self._load_text,
+            ".md": self._load_text,
+            ".pdf": self._load_pdf,
+            ".docx": self._load_docx,
         }
         
-        for pattern, loader_func in patterns.items():
-            for filepath in glob.glob(f"{source}/{pattern}"):
+        # Uma única varredura do diretório (DirEntry já traz o tipo do arquivo)
+        jobs = []
+        try:
+            with os.scandir(source) as entries:
+                for entry in entries:
+                    if entry.name.startswith(".") or not entry.is_file():
+                        continue
+                    loader_func = loaders_by_suffix.get(Path(entry.name).suffix.lower())
+                    if loader_func:
+                        jobs.append((os.path.join(source, entry.name), loader_func))
+        except (FileNotFoundError, NotADirectoryError) as e:
+            logger.warning(f"Não foi possível listar {source}: {e}")
+        
+        jobs.sort(key=lambda job: job[0])
+        
+        documentos = []
+        if not jobs:
+            logger.info("Total de 0 documentos carregados.")
+            return documentos
+        
+        workers = max(1, min(self.max_workers, len(jobs)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                (filepath, executor.submit(loader_func, filepath))
+                for filepath, loader_func in jobs
+            ]
+            
+            # Coletar na ordem de submissão para manter o resultado determinístico
+            for filepath, future in futures:
                 try:
-                    doc = loader_func(filepath)
+                    doc = future.result()
                     if doc:
                         documentos.append(doc)
                         logger.debug(f"Arquivo {Path(filepath).name} carregado com sucesso.")
@@ -85,23 +132,26 @@ class UniversalLoader(IDocumentLoader):
             logger.error("PyMuPDF não está instalado. Execute: pip install PyMuPDF")
             raise ImportError("PyMuPDF não encontrado")
         
-        doc = fitz.open(filepath)
-        text_parts = []
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text_parts.append(page.get_text())
+        # Escrever cada página direto no buffer evita manter a lista de
+        # páginas e a string final em memória ao mesmo tempo
+        buffer = io.StringIO()
         
-        doc.close()
+        with _PDF_LOCK:
+            with fitz.open(filepath) as doc:
+                num_pages = len(doc)
+                for page_num, page in enumerate(doc):
+                    if page_num:
+                        buffer.write("\n")
+                    buffer.write(page.get_text())
         
-        conteudo = "\n".join(text_parts)
+        conteudo = buffer.getvalue()
         nome_arquivo = Path(filepath).name
         
         metadata = {
             "source": nome_arquivo,
             "path": filepath,
             "type": "pdf",
-            "pages": len(text_parts)
+            "pages": num_pages
         }
         
         return Documento(content=conteudo, metadata=metadata)
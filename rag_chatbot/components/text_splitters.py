@@ -118,48 +118,43 @@ class RecursiveCharacterTextSplitter(ITextSplitter):
         Returns:
             Lista de chunks.
         """
-        # Dividir o texto pelo separador
+        # Dividir o texto pelo separador; o chunk atual é a janela
+        # splits[start:end], então overlap e tamanho saem dos tamanhos
+        # pré-calculados sem copiar listas nem somar tudo de novo
         splits = text.split(separator)
+        sep_len = len(separator)
+        sizes = [len(split) + sep_len for split in splits]
         
         chunks = []
-        current_chunk = []
+        start = 0
         current_size = 0
         
-        for split in splits:
-            split_size = len(split) + len(separator)
-            
+        for end, split_size in enumerate(sizes):
             # Se adicionar este split ultrapassar o limite
-            if current_size + split_size > self.chunk_size and current_chunk:
+            if current_size + split_size > self.chunk_size and end > start:
                 # Finalizar o chunk atual
-                chunk_text = separator.join(current_chunk)
+                chunk_text = separator.join(splits[start:end])
                 if chunk_text:
                     chunks.append(chunk_text)
                 
-                # Começar novo chunk com overlap
-                # Pegar os últimos itens para criar overlap
+                # Começar novo chunk com overlap: recuar sobre os últimos
+                # itens do chunk enquanto couberem em chunk_overlap
                 overlap_size = 0
-                overlap_items = []
-                
-                for item in reversed(current_chunk):
-                    item_size = len(item) + len(separator)
-                    if overlap_size + item_size <= self.chunk_overlap:
-                        overlap_items.insert(0, item)
-                        overlap_size += item_size
-                    else:
-                        break
+                new_start = end
+                while new_start > start and overlap_size + sizes[new_start - 1] <= self.chunk_overlap:
+                    new_start -= 1
+                    overlap_size += sizes[new_start]
                 
-                current_chunk = overlap_items + [split]
-                current_size = sum(len(s) + len(separator) for s in current_chunk)
+                start = new_start
+                current_size = overlap_size + split_size
             else:
                 # Adicionar ao chunk atual
-                current_chunk.append(split)
                 current_size += split_size
         
         # Adicionar o último chunk
-        if current_chunk:
-            chunk_text = separator.join(current_chunk)
-            if chunk_text:
-                chunks.append(chunk_text)
+        chunk_text = separator.join(splits[start:])
+        if chunk_text:
+            chunks.append(chunk_text)
         
         return chunks
     
@@ -2,10 +2,11 @@
 
 import logging
 import hashlib
-from typing import List
+from typing import List, Optional, Tuple
 import chromadb
+import numpy as np
 
-from rag_chatbot.interfaces import IVectorStore, Documento
+from rag_chatbot.interfaces import IVectorStore, Documento, RetrievalResult
 from rag_chatbot.config import DEFAULT_COLLECTION_NAME, CHROMA_PERSIST_DIRECTORY
 
 logger = logging.getLogger(__name__)
@@ -42,7 +43,10 @@ class ChromaVectorStore(IVectorStore):
         logger.info(f"Coleção ChromaDB '{collection_name}' pronta.")
     
     def _generate_doc_id(self, document: Documento) -> str:
-        """Gera um ID único baseado no hash do conteúdo e metadados do documento.
+        """Gera um ID único baseado no hash do conteúdo e da origem do documento.
+        
+        O conteúdo completo entra no hash, então um arquivo editado gera IDs
+        novos e é reindexado, enquanto chunks inalterados mantêm o mesmo ID.
         
         Args:
             document: Documento para gerar ID.
@@ -50,21 +54,73 @@ class ChromaVectorStore(IVectorStore):
         Returns:
             ID único como string.
         """
-        # Criar hash baseado no caminho do arquivo se disponível, caso contrário do conteúdo
-        if 'path' in document.metadata:
-            content_to_hash = document.metadata['path']
-        else:
-            content_to_hash = document.content[:500]  # Primeiros 500 chars para hash
+        # Origem: caminho do arquivo se disponível, senão o id dos metadados
+        origin = document.metadata.get('path', document.metadata.get('id', ''))
         
-        hash_obj = hashlib.md5(content_to_hash.encode('utf-8'))
+        hash_obj = hashlib.md5(str(origin).encode('utf-8'))
+        hash_obj.update(b"\0")
+        hash_obj.update(document.content.encode('utf-8'))
         return f"doc_{hash_obj.hexdigest()}"
     
-    def add(self, documents: List[Documento], embeddings: List[List[float]]) -> None:
+    def missing_documents(self, documents: List[Documento]) -> List[Documento]:
+        """Retorna os documentos cujo ID ainda não está na coleção.
+        
+        Consultado antes do embedding, para que chunks inalterados não sejam
+        embedados de novo. Documentos repetidos aparecem uma vez só.
+        
+        Args:
+            documents: Documentos candidatos à ingestão.
+        
+        Returns:
+            Os documentos ausentes da coleção, na ordem de entrada.
+        """
+        if not documents:
+            return []
+        
+        ids = [self._generate_doc_id(doc) for doc in documents]
+        seen = set(self.collection.get(ids=list(dict.fromkeys(ids)), include=[])['ids'])
+        
+        missing = []
+        for doc_id, doc in zip(ids, documents):
+            if doc_id not in seen:
+                seen.add(doc_id)
+                missing.append(doc)
+        return missing
+    
+    def remove_stale(self, documents: List[Documento]) -> None:
+        """Remove da coleção os chunks que os arquivos reingeridos não têm mais.
+        
+        Como o ID depende do conteúdo, editar um arquivo gera IDs novos e os
+        antigos continuariam sendo retornados na busca. Para cada `path` em
+        `documents`, apaga os IDs gravados com esse `path` que não estão
+        entre os IDs atuais. Documentos sem `path` são ignorados.
+        
+        Args:
+            documents: Todos os documentos atuais dos arquivos reingeridos.
+        """
+        current_ids = {}
+        for doc in documents:
+            path = doc.metadata.get('path')
+            if path is not None:
+                current_ids.setdefault(path, set()).add(self._generate_doc_id(doc))
+        
+        for path, keep in current_ids.items():
+            stored = self.collection.get(where={"path": path}, include=[])['ids']
+            stale = [doc_id for doc_id in stored if doc_id not in keep]
+            if stale:
+                self.collection.delete(ids=stale)
+                logger.info(f"{len(stale)} chunks antigos de '{path}' removidos do RAG.")
+    
+    def add(self, documents: List[Documento], embeddings: np.ndarray) -> None:
         """Adiciona documentos e seus embeddings ao store usando upsert.
         
+        Documentos cujo ID (hash de conteúdo e origem) já existe na coleção
+        são ignorados, assim reingerir um corpus pouco alterado só grava os
+        chunks novos ou modificados.
+        
         Args:
             documents: Lista de documentos.
-            embeddings: Lista de embeddings correspondentes.
+            embeddings: Matriz (N, D) com os embeddings correspondentes.
         """
         if not documents:
             logger.warning("Nenhum documento para adicionar.")
@@ -73,46 +129,310 @@ class ChromaVectorStore(IVectorStore):
         # Gerar IDs únicos baseados em hash dos documentos
         ids = [self._generate_doc_id(doc) for doc in documents]
         
-        # Extrair metadados e conteúdos
-        metadatas = [doc.metadata for doc in documents]
-        contents = [doc.content for doc in documents]
+        # Pular os que já estão na coleção
+        existing = set(self.collection.get(ids=list(dict.fromkeys(ids)), include=[])['ids'])
+        
+        # Uma única passada monta as colunas do upsert; chunks idênticos no
+        # mesmo lote geram o mesmo ID, então só o primeiro é mantido
+        seen = set()
+        keep, new_ids, metadatas, contents = [], [], [], []
+        for i, (doc_id, doc) in enumerate(zip(ids, documents)):
+            if doc_id in existing or doc_id in seen:
+                continue
+            seen.add(doc_id)
+            keep.append(i)
+            new_ids.append(doc_id)
+            metadatas.append(doc.metadata)
+            contents.append(doc.content)
         
-        # Usar upsert em vez de add para evitar duplicatas
+        if not new_ids:
+            logger.info(f"Nenhum documento novo: {len(documents)} já estavam no RAG.")
+            return
+        
+        # Embeddings selecionados com um único fancy-index sobre a matriz
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        new_embeddings = embeddings if len(keep) == len(embeddings) else embeddings[keep]
+        
+        # Usar upsert em vez de add para evitar duplicatas. O ChromaDB recebe
+        # listas: versões antigas (0.4.x) podem não validar arrays NumPy
         self.collection.upsert(
-            embeddings=embeddings,
+            embeddings=new_embeddings.tolist(),
             documents=contents,
             metadatas=metadatas,
-            ids=ids
+            ids=new_ids
         )
         
-        logger.info(f"{len(documents)} documentos adicionados/atualizados no RAG.")
+        logger.info(
+            f"{len(new_ids)} documentos adicionados/atualizados no RAG "
+            f"({len(documents) - len(new_ids)} inalterados ignorados)."
+        )
     
-    def search(self, query_embedding: List[float], k: int) -> List[Documento]:
+    def search(self, query_embedding: np.ndarray, k: int) -> List[Documento]:
         """Busca os k documentos mais similares ao query embedding.
         
         Args:
-            query_embedding: Vetor de embedding da query.
+            query_embedding: Vetor (D,) de embedding da query.
             k: Número de resultados a retornar.
             
         Returns:
             Lista dos k documentos mais similares.
         """
-        logger.debug(f"Buscando top {k} documentos similares.")
+        logger.debug("Buscando top %d documentos similares.", k)
         
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=np.asarray(query_embedding, dtype=np.float32).reshape(1, -1).tolist(),
             n_results=k
         )
         
-        # Converter resultados de volta para objetos Documento
-        documentos_encontrados = []
+        documentos_encontrados = self._unpack_results(results)[0]
+        logger.debug("Encontrados %d documentos.", len(documentos_encontrados))
+        return documentos_encontrados
+    
+    def search_with_scores(self, query_embedding: np.ndarray, k: int) -> RetrievalResult:
+        """Busca os k documentos mais similares, com os scores do ChromaDB.
         
-        if results['documents'] and results['documents'][0]:
-            for i, doc_content in enumerate(results['documents'][0]):
-                metadata = results['metadatas'][0][i] if results['metadatas'] else {}
-                documentos_encontrados.append(
-                    Documento(content=doc_content, metadata=metadata)
-                )
+        O score é a distância retornada pela coleção com sinal trocado, para
+        que maior signifique mais similar, como nos demais stores.
         
-        logger.debug(f"Encontrados {len(documentos_encontrados)} documentos.")
-        return documentos_encontrados
+        Args:
+            query_embedding: Vetor (D,) de embedding da query.
+            k: Número de resultados a retornar.
+        
+        Returns:
+            RetrievalResult na mesma ordem de `search`.
+        """
+        results = self.collection.query(
+            query_embeddings=np.asarray(query_embedding, dtype=np.float32).reshape(1, -1).tolist(),
+            n_results=k,
+            include=["documents", "metadatas", "distances"]
+        )
+        
+        documents = self._unpack_results(results)[0]
+        distances = (results.get('distances') or [[]])[0]
+        return RetrievalResult(documents, -np.asarray(distances, dtype=np.float32))
+    
+    def search_batch(self, query_embeddings: np.ndarray, k: int) -> List[List[Documento]]:
+        """Busca os k documentos mais similares para várias queries de uma vez.
+        
+        Faz uma única chamada a `collection.query` com todas as queries
+        (ex.: variações de query expansion), em vez de uma por query.
+        
+        Args:
+            query_embeddings: Matriz (Q, D) com os embeddings das queries.
+            k: Número de resultados a retornar por query.
+            
+        Returns:
+            Uma lista de documentos por query, na mesma ordem da entrada.
+        """
+        if len(query_embeddings) == 0:
+            return []
+        
+        logger.debug("Buscando top %d documentos para %d queries.", k, len(query_embeddings))
+        
+        results = self.collection.query(
+            query_embeddings=np.asarray(query_embeddings, dtype=np.float32).tolist(),
+            n_results=k
+        )
+        
+        return self._unpack_results(results, len(query_embeddings))
+    
+    @staticmethod
+    def _unpack_results(results: dict, num_queries: int = 1) -> List[List[Documento]]:
+        """Converte o resultado de `collection.query` em listas de Documento.
+        
+        Args:
+            results: Dicionário retornado pelo ChromaDB.
+            num_queries: Número de queries enviadas na consulta.
+            
+        Returns:
+            Uma lista de documentos por query.
+        """
+        all_documents = results['documents'] or []
+        all_metadatas = results['metadatas'] or []
+        
+        documentos_por_query = []
+        for q in range(num_queries):
+            contents = all_documents[q] if q < len(all_documents) else None
+            metadatas = all_metadatas[q] if q < len(all_metadatas) else None
+            documentos_por_query.append([
+                Documento(content=doc_content, metadata=metadatas[i] if metadatas else {})
+                for i, doc_content in enumerate(contents or [])
+            ])
+        
+        return documentos_por_query
+
+
+class InMemoryVectorStore(IVectorStore):
+    """Vector Store em memória com busca exata por força bruta.
+    
+    Mantém os embeddings numa matriz float32, já normalizados em `add`,
+    de modo que a similaridade de cosseno com a query é um único produto
+    matriz-vetor. Útil para coleções pequenas e testes, sem depender de
+    um servidor ou diretório de persistência.
+    
+    Com `prune_dims`, a busca continua exata mas descarta candidatos cedo:
+    o produto escalar é calculado só nas primeiras `prune_dims` dimensões
+    e, pela desigualdade de Cauchy-Schwarz, o restante é limitado por
+    ``||sufixo do vetor|| * ||sufixo da query||``. Apenas os candidatos cujo
+    limite superior alcança o k-ésimo melhor score terminam o cálculo.
+    Compensa em coleções grandes e agrupadas (embeddings de texto reais);
+    em dados sem estrutura quase nada é podado e a busca fica um pouco
+    mais lenta que a força bruta.
+    """
+    
+    # Se mais que esta fração sobreviver ao limite, o sufixo é calculado
+    # para todos: o produto denso é mais barato que indexar as linhas
+    PRUNE_MAX_SURVIVORS = 0.25
+    
+    def __init__(
+        self,
+        prune_dims: Optional[int] = None,
+        prune_min_size: int = 4096,
+        stable_ties: bool = False,
+    ):
+        """Inicializa o store vazio.
+        
+        Args:
+            prune_dims: Dimensões do prefixo usado para podar candidatos
+                (None desativa a poda). Metade da dimensão é um bom ponto
+                de partida.
+            prune_min_size: Número mínimo de documentos para podar; abaixo
+                disso a força bruta é sempre mais rápida.
+            stable_ties: Se True, ordena todas as similaridades de forma
+                estável, garantindo que empates no k-ésimo lugar fiquem com
+                o documento inserido primeiro. Por padrão só os k melhores
+                são selecionados (O(N) em vez de O(N log N)).
+        """
+        self.documents: List[Documento] = []
+        self._pending: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+        self.prune_dims = prune_dims
+        self.prune_min_size = prune_min_size
+        self.stable_ties = stable_ties
+        self._prune_layout: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+    
+    def add(self, documents: List[Documento], embeddings: np.ndarray) -> None:
+        """Adiciona documentos e seus embeddings ao store.
+        
+        Args:
+            documents: Lista de documentos.
+            embeddings: Matriz (N, D) com os embeddings correspondentes.
+        """
+        if not documents:
+            logger.warning("Nenhum documento para adicionar.")
+            return
+        
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if len(embeddings) != len(documents):
+            raise ValueError(
+                f"Número de embeddings ({len(embeddings)}) diferente do número "
+                f"de documentos ({len(documents)})."
+            )
+        
+        # Normaliza uma vez aqui para a busca não dividir pelas normas a cada
+        # query; vetores nulos continuam nulos (similaridade 0)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.maximum(norms, 1e-12)
+        
+        # Os lotes só são concatenados na próxima busca
+        self.documents.extend(documents)
+        self._pending.append(embeddings)
+        logger.info(f"{len(documents)} documentos adicionados ao store em memória.")
+    
+    def _embeddings(self) -> np.ndarray:
+        """Retorna a matriz (N, D) com todos os embeddings normalizados."""
+        if self._pending:
+            blocks = self._pending if self._matrix is None else [self._matrix] + self._pending
+            self._matrix = np.concatenate(blocks)
+            self._pending = []
+            self._prune_layout = None
+        return self._matrix
+    
+    def _pruning_blocks(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Retorna prefixos, sufixos e normas dos sufixos dos embeddings.
+        
+        Prefixo e sufixo ficam em blocos contíguos separados, para que cada
+        passada da busca seja um produto matriz-vetor denso.
+        """
+        matrix = self._embeddings()
+        if self._prune_layout is None:
+            prefixes = np.ascontiguousarray(matrix[:, :self.prune_dims])
+            suffixes = np.ascontiguousarray(matrix[:, self.prune_dims:])
+            self._prune_layout = (prefixes, suffixes, np.linalg.norm(suffixes, axis=1))
+        return self._prune_layout
+    
+    @staticmethod
+    def _normalize_query(query_embedding: np.ndarray) -> np.ndarray:
+        """Normaliza a query como os embeddings são normalizados em `add`."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        return query / max(np.linalg.norm(query), 1e-12)
+    
+    def _pruned_similarities(self, query_embedding: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Calcula a similaridade exata apenas dos candidatos que podem estar no top-k.
+        
+        Args:
+            query_embedding: Vetor (D,) de embedding da query.
+            k: Número de resultados desejados.
+        
+        Returns:
+            Tupla (índices dos candidatos em ordem crescente, similaridades).
+        """
+        prefixes, suffixes, suffix_norms = self._pruning_blocks()
+        query = self._normalize_query(query_embedding)
+        query_prefix, query_suffix = query[:self.prune_dims], query[self.prune_dims:]
+        
+        partial = prefixes @ query_prefix
+        upper = partial + suffix_norms * np.linalg.norm(query_suffix)
+        
+        # Os k maiores limites dão um piso para o k-ésimo melhor score exato
+        seeds = np.argpartition(-upper, k - 1)[:k]
+        threshold = (partial[seeds] + suffixes[seeds] @ query_suffix).min()
+        # Folga para o arredondamento de float32 não podar um empate
+        survivors = np.flatnonzero(upper >= threshold - 1e-5)
+        
+        if len(survivors) > self.PRUNE_MAX_SURVIVORS * len(prefixes):
+            return np.arange(len(prefixes)), partial + suffixes @ query_suffix
+        return survivors, partial[survivors] + suffixes[survivors] @ query_suffix
+    
+    def search(self, query_embedding: np.ndarray, k: int) -> List[Documento]:
+        """Busca os k documentos mais similares ao query embedding.
+        
+        Args:
+            query_embedding: Vetor (D,) de embedding da query.
+            k: Número de resultados a retornar.
+        
+        Returns:
+            Lista dos k documentos mais similares, em ordem decrescente de
+            similaridade (empates pela ordem de inserção).
+        """
+        return self.search_with_scores(query_embedding, k).documents
+    
+    def search_with_scores(self, query_embedding: np.ndarray, k: int) -> RetrievalResult:
+        """Busca os k documentos mais similares, com a similaridade de cosseno de cada um.
+        
+        Args:
+            query_embedding: Vetor (D,) de embedding da query.
+            k: Número de resultados a retornar.
+        
+        Returns:
+            RetrievalResult na mesma ordem de `search`.
+        """
+        if not self.documents or k <= 0:
+            return RetrievalResult([], np.empty(0, dtype=np.float32))
+        
+        if self.prune_dims and k < len(self.documents) and len(self.documents) >= self.prune_min_size:
+            candidates, similarities = self._pruned_similarities(query_embedding, k)
+        else:
+            candidates = None
+            similarities = self._embeddings() @ self._normalize_query(query_embedding)
+        
+        if self.stable_ties or k >= len(similarities):
+            top = np.argsort(-similarities, kind="stable")[:k]
+        else:
+            # Seleciona os k melhores em O(N) e ordena só eles
+            top = np.argpartition(-similarities, k - 1)[:k]
+            top = top[np.lexsort((top, -similarities[top]))]
+        scores = similarities[top]
+        if candidates is not None:
+            top = candidates[top]
+        return RetrievalResult([self.documents[i] for i in top], scores)
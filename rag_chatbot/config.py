@@ -29,6 +29,7 @@ DEFAULT_COLLECTION_NAME = os.getenv("DEFAULT_COLLECTION_NAME", "rag_store")
 
 # RAG Settings
 DEFAULT_TOP_K = int(os.getenv("DEFAULT_TOP_K", "3"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
 
 # Text Splitting
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
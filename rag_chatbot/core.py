@@ -2,7 +2,10 @@
 
 import logging
 import base64
-from typing import List, Dict, Any, Optional
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Tuple
 
 from rag_chatbot.interfaces import (
     IDocumentLoader,
@@ -12,11 +15,61 @@ from rag_chatbot.interfaces import (
     ITextSplitter,
     Documento
 )
-from rag_chatbot.config import DEFAULT_TOP_K
+from rag_chatbot.config import DEFAULT_TOP_K, INGEST_BATCH_SIZE
+from rag_chatbot.templates import compile_template
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=8)
+def _encode_image_cached(image_data: bytes) -> str:
+    """Codifica bytes de imagem em base64, com cache por conteúdo.
+    
+    Em conversas multimodais a mesma imagem é reenviada a cada turno;
+    o cache evita recodificá-la.
+    
+    Args:
+        image_data: Bytes da imagem.
+        
+    Returns:
+        Imagem codificada em base64.
+    """
+    # base64 é sempre ASCII, e decodificar ASCII é mais barato que UTF-8
+    return base64.b64encode(image_data).decode('ascii')
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[List]:
+    """Divide um iterável em listas de até `size` itens.
+    
+    Args:
+        items: Itens a dividir.
+        size: Tamanho máximo de cada lote.
+        
+    Yields:
+        Lotes consecutivos de itens.
+    """
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _encode_image(image_data) -> str:
+    """Codifica uma imagem em base64, usando o cache quando possível.
+    
+    Args:
+        image_data: Bytes da imagem (bytearray/memoryview não são cacheados).
+        
+    Returns:
+        Imagem codificada em base64.
+    """
+    if isinstance(image_data, bytes):
+        return _encode_image_cached(image_data)
+    return base64.b64encode(image_data).decode('ascii')
+
+
 class RAGChatbot:
     """Orquestrador principal do sistema RAG.
     
@@ -50,6 +103,8 @@ PERGUNTA: {question}
 
 RESPOSTA:"""
     
+    HISTORY_ROLE_PREFIXES = {"user": "Usuário: ", "assistant": "Assistente: "}
+    
     def __init__(
         self,
         loader: IDocumentLoader,
@@ -57,7 +112,9 @@ RESPOSTA:"""
         store: IVectorStore,
         llm: ILocalLLM,
         text_splitter: ITextSplitter = None,
-        prompt_template: str = None
+        prompt_template: str = None,
+        query_cache_size: int = 256,
+        ingest_batch_size: int = INGEST_BATCH_SIZE
     ):
         """Inicializa o RAG Chatbot com injeção de dependências.
         
@@ -68,6 +125,11 @@ RESPOSTA:"""
             llm: Implementação de ILocalLLM.
             text_splitter: Implementação de ITextSplitter (opcional).
             prompt_template: Template customizado (opcional).
+            query_cache_size: Número de perguntas cujo embedding fica em cache,
+                compartilhado entre `ask` e `get_sources` (0 desativa). Ignorado
+                quando o embedder já tem cache próprio (`caches_queries`).
+            ingest_batch_size: Número de chunks embedados e gravados por vez
+                na ingestão.
         """
         self.loader = loader
         self.embedder = embedder
@@ -75,6 +137,17 @@ RESPOSTA:"""
         self.llm = llm
         self.text_splitter = text_splitter
         self.prompt_template = prompt_template or self.PROMPT_TEMPLATE
+        self.ingest_batch_size = ingest_batch_size
+        
+        # `get_sources` costuma ser chamado logo após `ask` com a mesma
+        # pergunta: o embedding é calculado uma vez só. Se o embedder já
+        # cacheia as queries, um segundo cache aqui só duplicaria memória
+        if getattr(embedder, "caches_queries", False) is True:
+            self._embed_query_cached = embedder.embed_query
+        else:
+            self._embed_query_cached = functools.lru_cache(maxsize=query_cache_size)(
+                lambda question: self.embedder.embed_query(question)
+            )
         
         logger.info("RAGChatbot instanciado com sucesso.")
         if text_splitter:
@@ -106,46 +179,64 @@ RESPOSTA:"""
             documents = self.text_splitter.split_documents(documents)
             logger.info(f"Após divisão: {len(documents)} chunks.")
         
-        # 3. Gerar embeddings
-        logger.info(f"Gerando embeddings para {len(documents)} documentos...")
-        contents = [doc.content for doc in documents]
-        embeddings = self.embedder.embed_documents(contents)
+        # 3. Gerar embeddings e armazenar no vector store, em lotes: o pico de
+        # memória fica limitado a um lote de embeddings, e a gravação de um
+        # lote (thread separada) se sobrepõe ao embedding do próximo
+        logger.info(f"Gerando embeddings e armazenando {len(documents)} documentos "
+                    f"em lotes de {self.ingest_batch_size}...")
+        skipped = 0
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            pending_write = None
+            for batch in _chunked(documents, self.ingest_batch_size):
+                # Chunks já indexados não são embedados de novo
+                new_batch = self.vector_store.missing_documents(batch)
+                skipped += len(batch) - len(new_batch)
+                if not new_batch:
+                    continue
+                batch = new_batch
+                embeddings = self.embedder.embed_documents([doc.content for doc in batch])
+                
+                # Uma gravação por vez, na ordem; erros são propagados aqui
+                if pending_write is not None:
+                    pending_write.result()
+                pending_write = writer.submit(self.vector_store.add, batch, embeddings)
+            
+            if pending_write is not None:
+                pending_write.result()
         
-        # 4. Armazenar no vector store
-        logger.info("Armazenando documentos no vector store...")
-        self.vector_store.add(documents, embeddings)
+        # 4. Remover chunks que os arquivos reingeridos não contêm mais
+        self.vector_store.remove_stale(documents)
         
-        logger.info(f"Ingestão de dados concluída. {len(documents)} documentos processados.")
+        logger.info(f"Ingestão de dados concluída. {len(documents)} documentos processados "
+                    f"({skipped} já indexados).")
         return len(documents)
     
-    def ask(
-        self, 
-        question: str, 
-        k: int = DEFAULT_TOP_K,
-        image_data: bytes = None,
-        chat_history: List[Dict[str, str]] = None
-    ) -> str:
-        """Processo de gerar uma resposta para uma pergunta.
-        
-        Busca contexto relevante e gera resposta usando o LLM.
+    def _prepare_generation(
+        self,
+        question: str,
+        k: int,
+        image_data: Optional[bytes],
+        chat_history: Optional[List[Dict[str, str]]]
+    ) -> Tuple[str, Optional[List[str]]]:
+        """Busca o contexto e monta o prompt e as imagens para o LLM.
         
         Args:
             question: A pergunta do usuário.
             k: Número de documentos a recuperar como contexto.
-            image_data: Dados da imagem em bytes (opcional, para modelos multimodais).
+            image_data: Dados da imagem em bytes (opcional).
             chat_history: Histórico de conversa (opcional).
             
         Returns:
-            Resposta gerada pelo LLM.
+            Tupla (prompt, imagens em base64 ou None).
         """
-        logger.debug(f"Nova pergunta: {question}")
+        logger.debug("Nova pergunta: %s", question)
         
         # 1. Embedar a pergunta
         logger.debug("Gerando embedding da pergunta...")
-        query_embedding = self.embedder.embed_query(question)
+        query_embedding = self._embed_query_cached(question)
         
         # 2. Buscar documentos relevantes
-        logger.debug(f"Buscando top {k} documentos relevantes...")
+        logger.debug("Buscando top %d documentos relevantes...", k)
         context_documents = self.vector_store.search(query_embedding, k=k)
         
         # 3. Construir contexto
@@ -153,9 +244,8 @@ RESPOSTA:"""
             logger.warning("Nenhum documento encontrado no contexto.")
             context_str = "Nenhuma informação disponível."
         else:
-            context_texts = [doc.content for doc in context_documents]
-            context_str = "\n---\n".join(context_texts)
-            logger.debug(f"Contexto construído com {len(context_documents)} documentos.")
+            context_str = "\n---\n".join([doc.content for doc in context_documents])
+            logger.debug("Contexto construído com %d documentos.", len(context_documents))
         
         # 4. Construir prompt (com ou sem histórico)
         if chat_history:
@@ -165,7 +255,7 @@ RESPOSTA:"""
                 chat_history
             )
         else:
-            prompt = self.prompt_template.format(
+            prompt = compile_template(self.prompt_template).format(
                 context=context_str,
                 question=question
             )
@@ -174,15 +264,67 @@ RESPOSTA:"""
         images_base64 = None
         if image_data:
             logger.debug("Convertendo imagem para base64...")
-            images_base64 = [base64.b64encode(image_data).decode('utf-8')]
+            images_base64 = [_encode_image(image_data)]
+        
+        return prompt, images_base64
+    
+    def ask(
+        self, 
+        question: str, 
+        k: int = DEFAULT_TOP_K,
+        image_data: bytes = None,
+        chat_history: List[Dict[str, str]] = None
+    ) -> str:
+        """Processo de gerar uma resposta para uma pergunta.
+        
+        Busca contexto relevante e gera resposta usando o LLM.
+        
+        Args:
+            question: A pergunta do usuário.
+            k: Número de documentos a recuperar como contexto.
+            image_data: Dados da imagem em bytes (opcional, para modelos multimodais).
+            chat_history: Histórico de conversa (opcional).
+            
+        Returns:
+            Resposta gerada pelo LLM.
+        """
+        prompt, images_base64 = self._prepare_generation(question, k, image_data, chat_history)
         
         # 6. Gerar resposta
         logger.debug("Gerando resposta com LLM...")
         response = self.llm.generate(prompt, images_base64=images_base64)
-        logger.debug(f"Resposta gerada: {response[:100]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Resposta gerada: %s...", response[:100])
         
         return response
     
+    def ask_stream(
+        self, 
+        question: str, 
+        k: int = DEFAULT_TOP_K,
+        image_data: bytes = None,
+        chat_history: List[Dict[str, str]] = None
+    ) -> Iterator[str]:
+        """Como `ask`, mas entrega a resposta em pedaços conforme é gerada.
+        
+        A busca de contexto acontece antes do primeiro pedaço; a partir daí
+        cada token chega assim que o LLM o produz, reduzindo o tempo até a
+        primeira palavra na interface (o tempo total de geração é o mesmo).
+        
+        Args:
+            question: A pergunta do usuário.
+            k: Número de documentos a recuperar como contexto.
+            image_data: Dados da imagem em bytes (opcional, para modelos multimodais).
+            chat_history: Histórico de conversa (opcional).
+            
+        Yields:
+            Pedaços da resposta gerada pelo LLM.
+        """
+        prompt, images_base64 = self._prepare_generation(question, k, image_data, chat_history)
+        
+        logger.debug("Gerando resposta em streaming com LLM...")
+        yield from self.llm.generate_stream(prompt, images_base64=images_base64)
+    
     def _create_prompt_with_history(
         self, 
         context: str, 
@@ -199,21 +341,17 @@ RESPOSTA:"""
         Returns:
             Prompt formatado com histórico.
         """
-        # Formatar histórico de chat
-        history_lines = []
-        for msg in chat_history:
-            role = msg.get("role", "")
-            content = msg.get("content", "")
-            
-            if role == "user":
-                history_lines.append(f"Usuário: {content}")
-            elif role == "assistant":
-                history_lines.append(f"Assistente: {content}")
-        
-        chat_history_str = "\n".join(history_lines) if history_lines else "Nenhum histórico."
+        # Formatar histórico de chat com os prefixos prontos de cada papel
+        # (mensagens de outros papéis são ignoradas)
+        role_prefixes = self.HISTORY_ROLE_PREFIXES
+        chat_history_str = "\n".join([
+            role_prefixes[msg["role"]] + msg.get("content", "")
+            for msg in chat_history
+            if msg.get("role") in role_prefixes
+        ]) or "Nenhum histórico."
         
         # Usar template com histórico
-        return self.PROMPT_TEMPLATE_WITH_HISTORY.format(
+        return compile_template(self.PROMPT_TEMPLATE_WITH_HISTORY).format(
             chat_history=chat_history_str,
             context=context,
             question=question
@@ -231,5 +369,5 @@ RESPOSTA:"""
         Returns:
             Lista de documentos fonte.
         """
-        query_embedding = self.embedder.embed_query(question)
+        query_embedding = self._embed_query_cached(question)
         return self.vector_store.search(query_embedding, k=k)
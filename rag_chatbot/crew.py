@@ -4,10 +4,15 @@ This module implements a crew-based multi-agent system inspired by crewAI,
 allowing specialized agents to collaborate on complex tasks.
 """
 
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from rag_chatbot.tools import BaseTool
 from rag_chatbot.interfaces import ILocalLLM
 
@@ -36,17 +41,86 @@ class CrewAgent:
         backstory: Agent's background and expertise.
         tools: List of tools available to the agent.
         llm: Language model for the agent.
+        cache_mode: Response caching: "none" (default) or "exact", which reuses
+            the answer for a prompt already seen (ignoring whitespace changes).
+        cache_ttl: Seconds a cached response stays valid (None = no expiry).
+        cache_max_entries: Maximum number of cached responses; the least
+            recently used is evicted first.
     """
     role: str
     goal: str
     backstory: str
     tools: List[BaseTool]
     llm: Optional[ILocalLLM] = None
+    cache_mode: str = "none"
+    cache_ttl: Optional[float] = None
+    cache_max_entries: int = 256
+    # Cached responses, most recently used last
+    _response_cache: "OrderedDict[str, Tuple[float, str]]" = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    # Parallel tasks of a crew may share an agent
+    _cache_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+    
+    CACHE_MODES = ("none", "exact")
     
     def __post_init__(self):
         """Initialize agent after creation."""
+        if self.cache_mode not in self.CACHE_MODES:
+            raise ValueError(
+                f"Unknown cache_mode '{self.cache_mode}'. Choose from: {self.CACHE_MODES}"
+            )
         logger.info(f"CrewAgent created: {self.role}")
     
+    def system_prompt(self) -> str:
+        """Build the agent's static system prompt.
+        
+        Returns:
+            Role, goal and backstory, independent of the task being run.
+        """
+        return f"""You are a {self.role}.
+Goal: {self.goal}
+Background: {self.backstory}"""
+    
+    def _cached_generate(self, prompt: str, system: str) -> str:
+        """Call the LLM, reusing a cached response when caching is enabled.
+        
+        Args:
+            prompt: User prompt.
+            system: System prompt.
+            
+        Returns:
+            Generated (or cached) text.
+        """
+        if self.cache_mode == "none":
+            return self.llm.generate(prompt, system=system)
+        
+        # Whitespace-normalized so reformatted but identical prompts still hit
+        key_source = " ".join(system.split()) + "\0" + " ".join(prompt.split())
+        key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+        
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                stored_at, response = cached
+                if self.cache_ttl is None or now - stored_at <= self.cache_ttl:
+                    self._response_cache.move_to_end(key)
+                    logger.debug("Agent '%s' reusing cached response", self.role)
+                    return response
+                # Expired: drop it so stale entries don't accumulate
+                del self._response_cache[key]
+        
+        response = self.llm.generate(prompt, system=system)
+        if self.cache_max_entries > 0:
+            with self._cache_lock:
+                self._response_cache[key] = (now, response)
+                if len(self._response_cache) > self.cache_max_entries:
+                    self._response_cache.popitem(last=False)
+        return response
+    
     def execute(self, task: 'Task', context: str = "") -> str:
         """Execute a task.
         
@@ -59,23 +133,21 @@ class CrewAgent:
         """
         logger.info(f"Agent '{self.role}' executing task: {task.description[:50]}...")
         
-        # Build prompt for the agent
-        prompt = f"""You are a {self.role}.
-Goal: {self.goal}
-Background: {self.backstory}
-
-{"Context from previous tasks: " + context if context else ""}
-
-Task: {task.description}
-
-Expected output: {task.expected_output}
-
-Please complete this task:"""
+        # The system prompt only depends on the agent, so it stays identical
+        # across tasks and the backend can reuse its cached prefix; everything
+        # that varies per call goes into the user prompt
+        parts = [
+            f"Context from previous tasks: {context}" if context else "",
+            f"Task: {task.description}",
+            f"Expected output: {task.expected_output}",
+            "Please complete this task:",
+        ]
+        prompt = "\n\n".join(part for part in parts if part)
         
         if self.llm:
             try:
-                result = self.llm.generate(prompt)
-                logger.debug(f"Agent '{self.role}' completed task")
+                result = self._cached_generate(prompt, self.system_prompt())
+                logger.debug("Agent '%s' completed task", self.role)
                 return result
             except Exception as e:
                 logger.error(f"Agent '{self.role}' failed: {e}")
@@ -94,15 +166,18 @@ class Task:
         expected_output: What the output should look like.
         agent: Which agent should do this task.
         context: Optional list of tasks that provide context.
+        uses_context: Whether the task reads the output of previous tasks.
+            Consecutive tasks with False run in parallel in a sequential crew.
     """
     description: str
     expected_output: str
     agent: CrewAgent
     context: Optional[List['Task']] = None
+    uses_context: bool = True
     
     def __post_init__(self):
         """Initialize task after creation."""
-        logger.debug(f"Task created for agent '{self.agent.role}'")
+        logger.debug("Task created for agent '%s'", self.agent.role)
 
 
 class Crew:
@@ -163,7 +238,11 @@ class Crew:
     def _execute_sequential(self) -> str:
         """Execute tasks sequentially.
         
-        Each task's output becomes context for the next task.
+        Each task's output becomes context for the next task. Runs of
+        consecutive tasks with ``uses_context=False`` don't depend on each
+        other, so they are executed in parallel (up to ``max_parallel``
+        from the crew config, default 4); their outputs are still appended
+        to the context in task order.
         
         Returns:
             Output from the final task.
@@ -172,23 +251,44 @@ class Crew:
         
         context = ""
         final_output = ""
+        max_parallel = self.config.get('max_parallel', 4)
         
-        for i, task in enumerate(self.tasks):
+        i = 0
+        while i < len(self.tasks):
+            # Group consecutive context-free tasks into one parallel batch
+            batch_end = i + 1
+            if not self.tasks[i].uses_context:
+                while batch_end < len(self.tasks) and not self.tasks[batch_end].uses_context:
+                    batch_end += 1
+            batch = self.tasks[i:batch_end]
+            
             if self.verbose:
-                logger.info(f"\n{'='*60}")
-                logger.info(f"Task {i+1}/{len(self.tasks)}: {task.description[:50]}...")
-                logger.info(f"Agent: {task.agent.role}")
-                logger.info(f"{'='*60}\n")
+                for j, task in enumerate(batch, start=i):
+                    logger.info(f"\n{'='*60}")
+                    logger.info(f"Task {j+1}/{len(self.tasks)}: {task.description[:50]}...")
+                    logger.info(f"Agent: {task.agent.role}")
+                    logger.info(f"{'='*60}\n")
             
-            # Execute task with accumulated context
-            result = task.agent.execute(task, context=context)
+            if len(batch) > 1 and max_parallel > 1:
+                logger.debug("Running tasks %d-%d in parallel", i + 1, batch_end)
+                with ThreadPoolExecutor(max_workers=min(max_parallel, len(batch))) as executor:
+                    results = list(executor.map(lambda task: task.agent.execute(task, context=""), batch))
+            else:
+                # Execute task with accumulated context
+                results = [
+                    task.agent.execute(task, context=context if task.uses_context else "")
+                    for task in batch
+                ]
             
-            if self.verbose:
-                logger.info(f"Result: {result[:100]}...\n")
+            for j, result in enumerate(results, start=i):
+                if self.verbose:
+                    logger.info(f"Result: {result[:100]}...\n")
+                
+                # Add result to context for next task
+                context += f"\n\n--- Task {j+1} Output ---\n{result}"
+                final_output = result
             
-            # Add result to context for next task
-            context += f"\n\n--- Task {i+1} Output ---\n{result}"
-            final_output = result
+            i = batch_end
         
         logger.info("Sequential workflow completed")
         return final_output
@@ -250,4 +350,4 @@ class Crew:
             task: Task to add.
         """
         self.tasks.append(task)
-        logger.debug(f"Added task for agent: {task.agent.role}")
+        logger.debug("Added task for agent: %s", task.agent.role)
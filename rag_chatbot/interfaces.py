@@ -6,21 +6,49 @@ Inversão de Dependência, permitindo substituição e testabilidade.
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterator
+
+import numpy as np
 
 
 @dataclass
 class Documento:
     """Representa um documento com conteúdo e metadados.
     
+    Usa `__slots__` (sem `__dict__` por instância), o que reduz a memória
+    de stores com muitos chunks e acelera o acesso aos atributos.
+    
     Attributes:
         content: O conteúdo textual do documento.
         metadata: Dicionário com informações adicionais (source, etc.).
     """
+    __slots__ = ("content", "metadata")
+    
     content: str
     metadata: Dict[str, Any]
 
 
+@dataclass(eq=False)
+class RetrievalResult:
+    """Resultado de uma busca, com os scores ao lado dos documentos.
+    
+    Os scores ficam num único vetor (em vez de um atributo por documento),
+    prontos para filtros vetorizados antes do re-ranking.
+    
+    Attributes:
+        documents: Documentos encontrados, do mais ao menos similar.
+        scores: Vetor float32 (K,) alinhado com `documents`; maior é mais
+            similar. NaN quando o store não fornece scores.
+    """
+    __slots__ = ("documents", "scores")
+    
+    documents: List[Documento]
+    scores: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.documents)
+
+
 class IDocumentLoader(ABC):
     """Interface para carregamento de documentos de uma fonte."""
     
@@ -38,29 +66,36 @@ class IDocumentLoader(ABC):
 
 
 class IEmbeddingModel(ABC):
-    """Interface para modelos de embedding de texto."""
+    """Interface para modelos de embedding de texto.
+    
+    Attributes:
+        caches_queries: True se `embed_query` já mantém um cache próprio,
+            para que chamadores não empilhem outro por cima.
+    """
+    
+    caches_queries: bool = False
     
     @abstractmethod
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
         """Gera embeddings para uma lista de textos.
         
         Args:
             texts: Lista de textos para embedar.
             
         Returns:
-            Lista de vetores de embedding.
+            Matriz float32 contígua de shape (N, D), uma linha por texto.
         """
         pass
     
     @abstractmethod
-    def embed_query(self, text: str) -> List[float]:
+    def embed_query(self, text: str) -> np.ndarray:
         """Gera embedding para uma única query.
         
         Args:
             text: Texto da query.
             
         Returns:
-            Vetor de embedding.
+            Vetor float32 de shape (D,).
         """
         pass
 
@@ -69,27 +104,85 @@ class IVectorStore(ABC):
     """Interface para armazenamento e busca de vetores."""
     
     @abstractmethod
-    def add(self, documents: List[Documento], embeddings: List[List[float]]) -> None:
+    def add(self, documents: List[Documento], embeddings: np.ndarray) -> None:
         """Adiciona documentos e seus embeddings ao store.
         
         Args:
             documents: Lista de documentos.
-            embeddings: Lista de embeddings correspondentes.
+            embeddings: Matriz (N, D) com os embeddings correspondentes
+                (listas de floats também são aceitas).
         """
         pass
     
     @abstractmethod
-    def search(self, query_embedding: List[float], k: int) -> List[Documento]:
+    def search(self, query_embedding: np.ndarray, k: int) -> List[Documento]:
         """Busca os k documentos mais similares ao query embedding.
         
         Args:
-            query_embedding: Vetor de embedding da query.
+            query_embedding: Vetor (D,) de embedding da query.
             k: Número de resultados a retornar.
             
         Returns:
             Lista dos k documentos mais similares.
         """
         pass
+    
+    def search_batch(self, query_embeddings: np.ndarray, k: int) -> List[List[Documento]]:
+        """Busca os k documentos mais similares para cada query embedding.
+        
+        A implementação padrão chama `search` uma vez por query; stores com
+        suporte nativo a consultas em lote devem sobrescrever este método.
+        
+        Args:
+            query_embeddings: Matriz (Q, D) com os embeddings das queries.
+            k: Número de resultados a retornar por query.
+            
+        Returns:
+            Uma lista de documentos por query, na mesma ordem da entrada.
+        """
+        return [self.search(query_embedding, k) for query_embedding in query_embeddings]
+    
+    def search_with_scores(self, query_embedding: np.ndarray, k: int) -> RetrievalResult:
+        """Busca os k documentos mais similares e devolve também os scores.
+        
+        A implementação padrão chama `search` e preenche os scores com NaN;
+        stores que calculam a similaridade devem sobrescrever este método.
+        
+        Args:
+            query_embedding: Vetor (D,) de embedding da query.
+            k: Número de resultados a retornar.
+        
+        Returns:
+            RetrievalResult com os documentos e seus scores.
+        """
+        documents = self.search(query_embedding, k)
+        return RetrievalResult(documents, np.full(len(documents), np.nan, dtype=np.float32))
+    
+    def missing_documents(self, documents: List[Documento]) -> List[Documento]:
+        """Retorna os documentos que ainda não estão no store.
+        
+        Permite ao orquestrador pular o embedding de chunks já indexados.
+        A implementação padrão considera todos novos; stores com IDs
+        determinísticos devem sobrescrever este método.
+        
+        Args:
+            documents: Documentos candidatos à ingestão.
+        
+        Returns:
+            Os documentos ausentes do store, na ordem de entrada.
+        """
+        return list(documents)
+    
+    def remove_stale(self, documents: List[Documento]) -> None:
+        """Remove entradas antigas das origens reingeridas em `documents`.
+        
+        Chamado após a ingestão completa de uma fonte, com todos os seus
+        documentos. A implementação padrão não faz nada.
+        
+        Args:
+            documents: Todos os documentos atuais das origens reingeridas.
+        """
+        pass
 
 
 class ITextSplitter(ABC):
@@ -112,14 +205,39 @@ class ILocalLLM(ABC):
     """Interface para modelos de linguagem locais."""
     
     @abstractmethod
-    def generate(self, prompt: str, images_base64: List[str] = None) -> str:
+    def generate(self, prompt: str, images_base64: List[str] = None, system: Optional[str] = None) -> str:
         """Gera texto a partir de um prompt.
         
         Args:
             prompt: O prompt para geração.
             images_base64: Lista de imagens em base64 (opcional, para modelos multimodais).
+            system: Instrução de sistema estável entre chamadas (opcional). Mantê-la
+                separada do prompt permite que o backend reaproveite o prefixo em cache.
             
         Returns:
             Texto gerado pelo modelo.
         """
         pass
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        images_base64: List[str] = None,
+        system: Optional[str] = None
+    ) -> Iterator[str]:
+        """Gera texto a partir de um prompt, entregando-o em pedaços.
+        
+        Permite exibir a resposta assim que o primeiro token chega, em vez
+        de esperar a geração completa. A implementação padrão produz a
+        resposta inteira de uma vez; LLMs com suporte a streaming devem
+        sobrescrever este método.
+        
+        Args:
+            prompt: O prompt para geração.
+            images_base64: Lista de imagens em base64 (opcional).
+            system: Instrução de sistema (opcional).
+            
+        Yields:
+            Pedaços do texto gerado, em ordem.
+        """
+        yield self.generate(prompt, images_base64=images_base64, system=system)
@@ -4,10 +4,15 @@ This module provides the Pipeline class for building and executing
 RAG workflows in a declarative manner.
 """
 
+import asyncio
 import logging
-from typing import Optional, List
+from typing import Optional, List, Iterator
+
+import numpy as np
+
 from rag_chatbot.base import BaseRetriever, BaseReRanker, BaseGenerator
-from rag_chatbot.interfaces import Documento
+from rag_chatbot.interfaces import Documento, RetrievalResult
+from rag_chatbot.templates import compile_template
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +30,7 @@ class Pipeline:
         ...     generator=my_generator
         ... )
         >>> response = pipeline.run("What is RAG?")
+        >>> response = await pipeline.arun("What is RAG?")  # from async code
     """
     
     DEFAULT_PROMPT_TEMPLATE = """Use the CONTEXT below to answer the QUESTION.
@@ -37,12 +43,15 @@ QUESTION: {question}
 
 ANSWER:"""
     
+    NO_CONTEXT_RESPONSE = "I don't have enough information to answer this question."
+    
     def __init__(
         self,
         retriever: BaseRetriever,
         generator: BaseGenerator,
         reranker: Optional[BaseReRanker] = None,
-        prompt_template: Optional[str] = None
+        prompt_template: Optional[str] = None,
+        prefilter_std: Optional[float] = None
     ):
         """Initialize the pipeline with components.
         
@@ -51,17 +60,24 @@ ANSWER:"""
             generator: Component for generating responses.
             reranker: Optional component for re-ranking documents.
             prompt_template: Optional custom prompt template.
+            prefilter_std: If set, retrieved documents whose retrieval
+                score is more than this many standard deviations below the
+                mean are dropped before re-ranking (at least ``top_n`` are
+                always kept). Requires a retriever whose
+                ``retrieve_with_scores`` returns scores, e.g.
+                `VectorRetriever`.
         """
         self.retriever = retriever
         self.reranker = reranker
         self.generator = generator
         self.prompt_template = prompt_template or self.DEFAULT_PROMPT_TEMPLATE
+        self.prefilter_std = prefilter_std
         
         logger.info("Pipeline initialized with retriever, generator" + 
                    (" and reranker" if reranker else ""))
     
-    def run(self, query: str, top_k: int = 10, top_n: int = 5) -> str:
-        """Execute the complete RAG pipeline.
+    def _build_prompt(self, query: str, top_k: int, top_n: int) -> Optional[str]:
+        """Retrieve, re-rank and build the generation prompt.
         
         Args:
             query: User's question.
@@ -69,39 +85,168 @@ ANSWER:"""
             top_n: Number of documents to use after re-ranking.
             
         Returns:
-            Generated response.
+            The prompt, or None if no documents were retrieved.
         """
-        logger.debug(f"Pipeline processing query: {query[:50]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Pipeline processing query: %s...", query[:50])
         
         # 1. Retrieve relevant documents
-        logger.debug(f"Retrieving top {top_k} documents...")
-        retrieved_docs = self.retriever.retrieve(query, top_k=top_k)
+        logger.debug("Retrieving top %d documents...", top_k)
+        retrieved = self._retrieve(query, top_k)
         
-        if not retrieved_docs:
+        if not retrieved.documents:
             logger.warning("No documents retrieved")
-            return "I don't have enough information to answer this question."
+            return None
         
         # 2. (Optional) Re-rank documents for improved precision
-        if self.reranker:
-            logger.debug(f"Re-ranking documents, selecting top {top_n}...")
-            ranked_docs = self.reranker.rerank(query, retrieved_docs, top_n=top_n)
-        else:
-            ranked_docs = retrieved_docs[:top_n]
+        ranked_docs = self._rerank(query, retrieved, top_n)
         
         # 3. Build prompt with retrieved context
         context = "\n---\n".join([doc.content for doc in ranked_docs])
-        prompt = self.prompt_template.format(
+        return compile_template(self.prompt_template).format(
             context=context,
             question=query
         )
+    
+    def _retrieve(self, query: str, top_k: int) -> RetrievalResult:
+        """Retrieve documents, with scores only when the prefilter needs them.
+        
+        Args:
+            query: User's question.
+            top_k: Number of documents to retrieve.
+        
+        Returns:
+            RetrievalResult; scores are NaN when not requested.
+        """
+        if self.reranker and self.prefilter_std is not None:
+            return self.retriever.retrieve_with_scores(query, top_k=top_k)
+        
+        documents = self.retriever.retrieve(query, top_k=top_k)
+        return RetrievalResult(documents, np.full(len(documents), np.nan, dtype=np.float32))
+    
+    def _rerank(self, query: str, retrieved: RetrievalResult, top_n: int) -> List[Documento]:
+        """Re-rank retrieved documents, or truncate them without a reranker.
+        
+        Args:
+            query: User's question.
+            retrieved: Retrieved documents, most similar first, and their scores.
+            top_n: Number of documents to keep.
+        
+        Returns:
+            The top_n documents to use as context.
+        """
+        documents = retrieved.documents
+        if not self.reranker or not documents:
+            return documents[:top_n]
+        
+        if self.prefilter_std is not None:
+            documents = self._prefilter(retrieved, top_n)
+        
+        logger.debug("Re-ranking %d documents, selecting top %d...", len(documents), top_n)
+        return self.reranker.rerank(query, documents, top_n=top_n)
+    
+    def _prefilter(self, retrieved: RetrievalResult, top_n: int) -> List[Documento]:
+        """Drop documents whose retrieval score is well below the mean.
+        
+        The reranker is the expensive step, so candidates the retriever
+        already scored poorly are skipped. Missing (NaN) scores disable
+        the filter.
+        
+        Args:
+            retrieved: Retrieved documents and their scores.
+            top_n: Minimum number of documents to keep.
+        
+        Returns:
+            The surviving documents, in their original order.
+        """
+        documents = retrieved.documents
+        if top_n <= 0 or len(documents) <= top_n:
+            return documents
+        
+        scores = np.asarray(retrieved.scores, dtype=np.float32)
+        if len(scores) != len(documents) or not np.isfinite(scores).all():
+            return documents
+        
+        cutoff = scores.mean() - self.prefilter_std * scores.std()
+        # Never keep fewer than top_n candidates
+        cutoff = min(cutoff, np.partition(scores, len(scores) - top_n)[len(scores) - top_n])
+        
+        kept = [doc for doc, keep in zip(documents, scores >= cutoff) if keep]
+        logger.debug("Prefilter kept %d of %d documents", len(kept), len(documents))
+        return kept
+    
+    def run(self, query: str, top_k: int = 10, top_n: int = 5) -> str:
+        """Execute the complete RAG pipeline.
+        
+        Args:
+            query: User's question.
+            top_k: Number of documents to retrieve.
+            top_n: Number of documents to use after re-ranking.
+            
+        Returns:
+            Generated response.
+        """
+        prompt = self._build_prompt(query, top_k, top_n)
+        if prompt is None:
+            return self.NO_CONTEXT_RESPONSE
         
         # 4. Generate final response
         logger.debug("Generating response...")
         response = self.generator.generate(prompt)
         
-        logger.debug(f"Pipeline completed, response length: {len(response)}")
+        logger.debug("Pipeline completed, response length: %d", len(response))
         return response
     
+    def run_stream(self, query: str, top_k: int = 10, top_n: int = 5) -> Iterator[str]:
+        """Execute the pipeline, yielding the response as it is generated.
+        
+        Retrieval and re-ranking still run up front, but the first token
+        reaches the caller as soon as the generator emits it instead of
+        after the whole answer (lower time-to-first-token, same total
+        generation time).
+        
+        Args:
+            query: User's question.
+            top_k: Number of documents to retrieve.
+            top_n: Number of documents to use after re-ranking.
+            
+        Yields:
+            Chunks of the generated response.
+        """
+        prompt = self._build_prompt(query, top_k, top_n)
+        if prompt is None:
+            yield self.NO_CONTEXT_RESPONSE
+            return
+        
+        logger.debug("Streaming response...")
+        yield from self.generator.generate_stream(prompt)
+    
+    async def arun(self, query: str, top_k: int = 10, top_n: int = 5) -> str:
+        """Execute the pipeline without blocking the event loop.
+        
+        Retrieval and re-ranking run in a worker thread while the
+        generator warms up in another, then generation runs in a thread
+        too. Several queries (or pipelines) awaited together therefore
+        overlap their I/O-bound retrieval and generation.
+        
+        Args:
+            query: User's question.
+            top_k: Number of documents to retrieve.
+            top_n: Number of documents to use after re-ranking.
+        
+        Returns:
+            Generated response.
+        """
+        prompt, _ = await asyncio.gather(
+            asyncio.to_thread(self._build_prompt, query, top_k, top_n),
+            asyncio.to_thread(self.generator.warmup),
+        )
+        if prompt is None:
+            return self.NO_CONTEXT_RESPONSE
+        
+        logger.debug("Generating response...")
+        return await asyncio.to_thread(self.generator.generate, prompt)
+    
     def get_sources(self, query: str, top_k: int = 10, top_n: int = 5) -> List[Documento]:
         """Get source documents without generating a response.
         
@@ -115,9 +260,17 @@ ANSWER:"""
         Returns:
             List of source documents.
         """
-        retrieved_docs = self.retriever.retrieve(query, top_k=top_k)
+        return self._rerank(query, self._retrieve(query, top_k), top_n)
+    
+    async def aget_sources(self, query: str, top_k: int = 10, top_n: int = 5) -> List[Documento]:
+        """Get source documents without blocking the event loop.
         
-        if self.reranker and retrieved_docs:
-            return self.reranker.rerank(query, retrieved_docs, top_n=top_n)
-        else:
-            return retrieved_docs[:top_n]
+        Args:
+            query: User's question.
+            top_k: Number of documents to retrieve.
+            top_n: Number of documents to return after re-ranking.
+        
+        Returns:
+            List of source documents.
+        """
+        return await asyncio.to_thread(self.get_sources, query, top_k, top_n)
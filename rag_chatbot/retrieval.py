@@ -4,11 +4,12 @@ This module implements hybrid search combining semantic (vector)
 and lexical (BM25) retrieval using Reciprocal Rank Fusion.
 """
 
+import heapq
 import logging
 from typing import List, Dict
 from collections import defaultdict
 from rag_chatbot.base import BaseRetriever
-from rag_chatbot.interfaces import Documento, IVectorStore, IEmbeddingModel
+from rag_chatbot.interfaces import Documento, IVectorStore, IEmbeddingModel, RetrievalResult
 
 logger = logging.getLogger(__name__)
 
@@ -67,10 +68,10 @@ class BM25Retriever:
             if overlap > 0:
                 scores.append((overlap, doc_data['doc']))
         
-        # Sort by score descending
-        scores.sort(key=lambda x: x[0], reverse=True)
+        # Top-k by score descending (ties keep index order, like a stable sort)
+        top = heapq.nlargest(top_k, scores, key=lambda x: x[0])
         
-        return [doc for score, doc in scores[:top_k]]
+        return [doc for score, doc in top]
 
 
 class VectorRetriever(BaseRetriever):
@@ -103,6 +104,19 @@ class VectorRetriever(BaseRetriever):
         """
         query_embedding = self.embedder.embed_query(query_text)
         return self.vector_store.search(query_embedding, k=top_k)
+    
+    def retrieve_with_scores(self, query_text: str, top_k: int = 10) -> RetrievalResult:
+        """Retrieve documents by semantic similarity, with the store's scores.
+        
+        Args:
+            query_text: Search query.
+            top_k: Number of documents to retrieve.
+        
+        Returns:
+            RetrievalResult in the same order as `retrieve`.
+        """
+        query_embedding = self.embedder.embed_query(query_text)
+        return self.vector_store.search_with_scores(query_embedding, k=top_k)
 
 
 class HybridRetriever(BaseRetriever):
@@ -159,8 +173,8 @@ class HybridRetriever(BaseRetriever):
         vector_results = self.vector_retriever.retrieve(query_text, top_k=top_k)
         bm25_results = self.bm25_retriever.retrieve(query_text, top_k=top_k)
         
-        logger.debug(f"Vector retriever: {len(vector_results)} docs, "
-                    f"BM25 retriever: {len(bm25_results)} docs")
+        logger.debug("Vector retriever: %d docs, BM25 retriever: %d docs",
+                     len(vector_results), len(bm25_results))
         
         # Calculate RRF scores
         rrf_scores = defaultdict(float)
@@ -178,14 +192,9 @@ class HybridRetriever(BaseRetriever):
             all_docs[doc_id] = doc
             rrf_scores[doc_id] += 1.0 / (self.k_rrf + rank + 1)
         
-        # Sort by combined RRF score
-        sorted_doc_ids = sorted(
-            rrf_scores.keys(),
-            key=lambda doc_id: rrf_scores[doc_id],
-            reverse=True
-        )
+        logger.debug("RRF fusion produced %d unique documents", len(rrf_scores))
         
-        final_docs = [all_docs[doc_id] for doc_id in sorted_doc_ids]
+        # Top-k by combined RRF score
+        top_doc_ids = heapq.nlargest(top_k, rrf_scores, key=rrf_scores.__getitem__)
         
-        logger.debug(f"RRF fusion produced {len(final_docs)} unique documents")
-        return final_docs[:top_k]
+        return [all_docs[doc_id] for doc_id in top_doc_ids]
@@ -5,11 +5,14 @@ for a given task based on complexity, cost, and performance requirements.
 """
 
 import logging
-from typing import Dict, Optional
+import re
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
 from enum import Enum
 import numpy as np
 from rag_chatbot.base import BaseComponent
 from rag_chatbot.interfaces import ILocalLLM, IEmbeddingModel
+from rag_chatbot.similarity import cosine_batch
 
 logger = logging.getLogger(__name__)
 
@@ -36,8 +39,16 @@ class Router(BaseComponent):
         - LLM routing: "Match model capability to task complexity"
         - Cost optimization: "Use cheaper models for simple tasks"
         - Semantic routing: "Fast embedding-based classification"
+    
+    Attributes:
+        COMPLEX_KEYWORDS: Phrases that mark a query as complex for rule-based routing.
     """
     
+    COMPLEX_KEYWORDS = (
+        "analyze", "compare", "contrast", "explain why", "reasoning",
+        "trade-off", "multi-step", "detailed", "comprehensive"
+    )
+    
     def __init__(
         self,
         models: Dict[str, ILocalLLM],
@@ -52,7 +63,11 @@ class Router(BaseComponent):
                    e.g., {"simple": llm1, "complex": llm2, "router": fast_llm}
             embedder: Optional embedding model for semantic routing.
             default_strategy: Default routing strategy.
-            **config: Additional configuration.
+            **config: Additional configuration. ``quantize_int8=True`` scores
+                semantic routes with int8-quantized embeddings (default False).
+                ``judge_cache_size`` bounds the LLM-judge classification
+                cache (default 1024, 0 disables it) and ``judge_cache_bits``
+                sets how many embedding sign bits form its key (default 128).
         """
         super().__init__(
             models=models,
@@ -66,9 +81,28 @@ class Router(BaseComponent):
         
         # Pre-compute task embeddings for semantic routing
         self.task_embeddings = {}
+        self._cat_matrix: Optional[np.ndarray] = None
+        self._cat_matrix_i8: Optional[np.ndarray] = None
+        self._cat_names = []
         if embedder:
             self._precompute_task_embeddings()
         
+        # All keywords in one case-insensitive pattern: a single scan per query
+        self._complex_re = re.compile(
+            "|".join(map(re.escape, self.COMPLEX_KEYWORDS)), re.IGNORECASE
+        )
+        
+        self._strategies = {
+            RoutingStrategy.SEMANTIC: self._route_semantic,
+            RoutingStrategy.LLM_JUDGE: self._route_llm_judge,
+            RoutingStrategy.RULE_BASED: self._route_rule_based,
+        }
+        
+        # LLM-judge classifications, most recently used last
+        self._judge_cache: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._judge_cache_size = self.config.get('judge_cache_size', 1024)
+        self._judge_cache_bits = self.config.get('judge_cache_bits', 128)
+        
         logger.info(f"Router initialized with {len(models)} models, "
                    f"strategy={default_strategy.value}")
     
@@ -104,8 +138,17 @@ class Router(BaseComponent):
         for category, examples in task_categories.items():
             # Compute average embedding for this category
             embeddings = self.embedder.embed_documents(examples)
-            avg_embedding = np.mean(embeddings, axis=0).tolist()
-            self.task_embeddings[category] = avg_embedding
+            self.task_embeddings[category] = np.mean(embeddings, axis=0, dtype=np.float32)
+        
+        # Stack the category centroids into one (C, D) matrix, normalized once
+        # here so routing a query is a single batched cosine call
+        self._cat_names = list(self.task_embeddings)
+        self._cat_matrix = np.stack([self.task_embeddings[name] for name in self._cat_names])
+        self._cat_matrix /= np.linalg.norm(self._cat_matrix, axis=1, keepdims=True) + 1e-12
+        
+        # Unit vectors fit int8 by scaling to [-127, 127]
+        if self.config.get('quantize_int8', False):
+            self._cat_matrix_i8 = np.round(self._cat_matrix * 127).astype(np.int8)
         
         logger.info(f"Pre-computed embeddings for {len(self.task_embeddings)} categories")
     
@@ -118,28 +161,26 @@ class Router(BaseComponent):
         Returns:
             Selected LLM.
         """
-        if not self.embedder or not self.task_embeddings:
+        if not self.embedder or self._cat_matrix is None:
             logger.warning("Semantic routing unavailable, falling back to rule-based")
             return self._route_rule_based(query_text)
         
         # Embed the query
         query_embedding = self.embedder.embed_query(query_text)
         
-        # Find closest task category
-        best_category = None
-        best_similarity = -1
-        
-        for category, category_embedding in self.task_embeddings.items():
-            # Calculate cosine similarity
-            similarity = np.dot(query_embedding, category_embedding) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(category_embedding)
-            )
-            
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_category = category
+        # Cosine similarity against every category at once
+        if self._cat_matrix_i8 is not None:
+            query = np.asarray(query_embedding, dtype=np.float32)
+            query = query / (np.linalg.norm(query) + 1e-12)
+            query_i8 = np.round(query * 127).astype(np.int8)
+            similarities = cosine_batch(query_i8, self._cat_matrix_i8)
+        else:
+            similarities = cosine_batch(query_embedding, self._cat_matrix, normalized=True)
+        best_index = int(similarities.argmax())
+        best_category = self._cat_names[best_index]
+        best_similarity = similarities[best_index]
         
-        logger.debug(f"Semantic routing: '{best_category}' (similarity: {best_similarity:.3f})")
+        logger.debug("Semantic routing: '%s' (similarity: %.3f)", best_category, best_similarity)
         
         # Map category to model
         if best_category in self.models:
@@ -166,38 +207,85 @@ class Router(BaseComponent):
             logger.warning("No router LLM configured, falling back to rule-based")
             return self._route_rule_based(query_text)
         
-        judge_prompt = f"""Classify the following task as "simple" or "complex".
-
-Simple tasks: factual questions, definitions, simple lookups
-Complex tasks: multi-step reasoning, analysis, comparisons, creative tasks
-
-Task: "{query_text}"
-
-Classification (respond with only "simple" or "complex"):"""
-        
         try:
-            response = router_llm.generate(judge_prompt).strip().lower()
-            
-            if "simple" in response:
-                classification = "simple"
-            elif "complex" in response:
-                classification = "complex"
-            else:
-                logger.warning(f"Unexpected classification: {response}")
-                classification = "simple"
-            
-            logger.debug(f"LLM judge routing: '{classification}'")
+            classification = self._judge_classification(router_llm, query_text)
             
             # Return appropriate model
             if classification in self.models:
                 return self.models[classification]
             else:
                 return self.models.get("simple", next(iter(self.models.values())))
-                
+        
         except Exception as e:
             logger.error(f"LLM judge routing failed: {e}")
             return self._route_rule_based(query_text)
     
+    def _judge_cache_key(self, query_text: str) -> Hashable:
+        """Compute the LLM-judge cache key for a query.
+        
+        With an embedder, the key is the sign pattern of the first
+        ``judge_cache_bits`` embedding dimensions (a locality-sensitive
+        hash), so near-identical phrasings share a classification. Without
+        one, the whitespace- and case-normalized text is used.
+        
+        Args:
+            query_text: The query to route.
+        
+        Returns:
+            Hashable cache key.
+        """
+        if self.embedder:
+            query_embedding = np.asarray(self.embedder.embed_query(query_text))
+            return np.packbits(query_embedding[:self._judge_cache_bits] > 0).tobytes()
+        return " ".join(query_text.lower().split())
+    
+    def _judge_classification(self, router_llm: ILocalLLM, query_text: str) -> str:
+        """Classify a query as "simple" or "complex", reusing cached decisions.
+        
+        Args:
+            router_llm: Fast LLM used as the judge.
+            query_text: The query to classify.
+        
+        Returns:
+            "simple" or "complex".
+        """
+        key = None
+        if self._judge_cache_size > 0:
+            key = self._judge_cache_key(query_text)
+            classification = self._judge_cache.get(key)
+            if classification is not None:
+                self._judge_cache.move_to_end(key)
+                logger.debug("LLM judge routing (cached): '%s'", classification)
+                return classification
+        
+        judge_prompt = f"""Classify the following task as "simple" or "complex".
+
+Simple tasks: factual questions, definitions, simple lookups
+Complex tasks: multi-step reasoning, analysis, comparisons, creative tasks
+
+Task: "{query_text}"
+
+Classification (respond with only "simple" or "complex"):"""
+
+        response = router_llm.generate(judge_prompt).strip().lower()
+        
+        if "simple" in response:
+            classification = "simple"
+        elif "complex" in response:
+            classification = "complex"
+        else:
+            logger.warning("Unexpected classification: %s", response)
+            classification = "simple"
+        
+        logger.debug("LLM judge routing: '%s'", classification)
+        
+        if key is not None:
+            self._judge_cache[key] = classification
+            if len(self._judge_cache) > self._judge_cache_size:
+                self._judge_cache.popitem(last=False)
+        
+        return classification
+    
     def _route_rule_based(self, query_text: str) -> ILocalLLM:
         """Route using simple heuristic rules.
         
@@ -210,19 +298,13 @@ Classification (respond with only "simple" or "complex"):"""
         # Simple heuristics
         query_length = len(query_text.split())
         
-        # Keywords indicating complexity
-        complex_keywords = [
-            "analyze", "compare", "contrast", "explain why", "reasoning",
-            "trade-off", "multi-step", "detailed", "comprehensive"
-        ]
-        
         is_complex = (
             query_length > 20 or
-            any(keyword in query_text.lower() for keyword in complex_keywords)
+            self._complex_re.search(query_text) is not None
         )
         
         classification = "complex" if is_complex else "simple"
-        logger.debug(f"Rule-based routing: '{classification}' (length={query_length})")
+        logger.debug("Rule-based routing: '%s' (length=%d)", classification, query_length)
         
         # Return appropriate model
         if classification in self.models:
@@ -240,17 +322,17 @@ Classification (respond with only "simple" or "complex"):"""
             
         Returns:
             Selected LLM for this query.
+        
+        Raises:
+            ValueError: If the strategy is not a RoutingStrategy.
         """
         routing_strategy = strategy or self.default_strategy
         
-        if routing_strategy == RoutingStrategy.SEMANTIC:
-            return self._route_semantic(query_text)
-        elif routing_strategy == RoutingStrategy.LLM_JUDGE:
-            return self._route_llm_judge(query_text)
-        elif routing_strategy == RoutingStrategy.RULE_BASED:
-            return self._route_rule_based(query_text)
-        else:
-            raise ValueError(f"Unknown routing strategy: {routing_strategy}")
+        try:
+            route_fn = self._strategies[routing_strategy]
+        except KeyError:
+            raise ValueError(f"Unknown routing strategy: {routing_strategy}") from None
+        return route_fn(query_text)
     
     def run(self, data, **kwargs):
         """Execute routing.
@@ -0,0 +1,59 @@
+"""Vector similarity kernels.
+
+This module centralizes the cosine similarity used by semantic
+routing. When the optional `simsimd` package is installed its SIMD
+kernels are used; otherwise a NumPy implementation produces the same
+scores.
+"""
+
+import numpy as np
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+# Element types with native simsimd cosine kernels
+_SIMSIMD_DTYPES = (np.dtype(np.float32), np.dtype(np.int8))
+
+
+def cosine_batch(query: np.ndarray, matrix: np.ndarray, normalized: bool = False) -> np.ndarray:
+    """Compute the cosine similarity between one query and many vectors.
+
+    Args:
+        query: Query vector of shape (D,).
+        matrix: Candidate vectors of shape (N, D).
+        normalized: Whether the rows of a float `matrix` already have unit
+            norm (e.g. normalized once at build time). The NumPy path then
+            only normalizes the query instead of every row per call.
+
+    Returns:
+        Similarities of shape (N,) as float32. Zero vectors score 0.
+    """
+    query = np.asarray(query)
+    matrix = np.asarray(matrix)
+
+    if matrix.shape[0] == 0:
+        return np.empty(0, dtype=np.float32)
+
+    # Float inputs (e.g. float64 lists from callers) are compared in float32;
+    # integer (quantized) inputs are kept as they are
+    if np.issubdtype(query.dtype, np.floating) and np.issubdtype(matrix.dtype, np.floating):
+        query = query.astype(np.float32, copy=False)
+        matrix = matrix.astype(np.float32, copy=False)
+
+    if simsimd is not None and query.dtype == matrix.dtype and query.dtype in _SIMSIMD_DTYPES:
+        distances = simsimd.cdist(
+            np.ascontiguousarray(query).reshape(1, -1),
+            np.ascontiguousarray(matrix),
+            metric="cosine",
+        )
+        return 1.0 - np.asarray(distances, dtype=np.float32)[0]
+
+    query = query.astype(np.float32, copy=False)
+    matrix = matrix.astype(np.float32, copy=False)
+    if normalized:
+        return matrix @ (query / max(np.linalg.norm(query), 1e-12))
+
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    return (matrix @ query) / np.where(norms == 0, 1.0, norms)
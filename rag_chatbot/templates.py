@@ -0,0 +1,79 @@
+"""Precompiled prompt templates.
+
+`str.format` re-parses the template on every call. Prompt templates are
+fixed for the lifetime of a chatbot or pipeline, so they are parsed once
+into literal fragments and field slots, and each render is a single join.
+"""
+
+import functools
+import string
+from typing import List, Optional, Tuple
+
+
+class CompiledTemplate:
+    """A `str.format` template parsed once and rendered by joining fragments.
+    
+    Only plain named fields (``{context}``) are compiled. Templates that
+    use positional fields, attribute/index access, conversions or format
+    specs fall back to `str.format`, so rendering always matches it.
+    """
+    
+    __slots__ = ("template", "_parts", "_fields")
+    
+    def __init__(self, template: str):
+        """Parse the template.
+        
+        Args:
+            template: Template in `str.format` syntax.
+        """
+        self.template = template
+        
+        parts: List[Optional[str]] = []
+        fields: List[Tuple[int, str]] = []
+        for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+            if literal:
+                parts.append(literal)
+            if field_name is None:
+                continue
+            if format_spec or conversion or not field_name.isidentifier():
+                parts, fields = None, None
+                break
+            fields.append((len(parts), field_name))
+            parts.append(None)
+        
+        self._parts = parts
+        self._fields = fields
+    
+    def format(self, **values) -> str:
+        """Render the template, like `template.format(**values)`.
+        
+        Args:
+            **values: Values for the template fields.
+        
+        Returns:
+            Rendered string.
+        
+        Raises:
+            KeyError: If a field has no value.
+        """
+        if self._parts is None:
+            return self.template.format(**values)
+        
+        parts = self._parts.copy()
+        for index, field_name in self._fields:
+            value = values[field_name]
+            parts[index] = value if type(value) is str else format(value, "")
+        return "".join(parts)
+
+
+@functools.lru_cache(maxsize=64)
+def compile_template(template: str) -> CompiledTemplate:
+    """Return the compiled form of a template, parsing it only once.
+    
+    Args:
+        template: Template in `str.format` syntax.
+    
+    Returns:
+        Cached CompiledTemplate for this template string.
+    """
+    return CompiledTemplate(template)
@@ -193,6 +193,43 @@ class TestRouting:
         assert model is not None
 
 
+# ==================== SIMILARITY TESTS ====================
+@pytest.mark.unit
+class TestSimilarity:
+    """Tests for the cosine similarity kernels."""
+    
+    @pytest.mark.parametrize("use_simsimd", [True, False])
+    def test_cosine_batch(self, use_simsimd, monkeypatch):
+        """Test cosine_batch with and without the simsimd backend."""
+        import numpy as np
+        from rag_chatbot import similarity
+        
+        if not use_simsimd:
+            monkeypatch.setattr(similarity, "simsimd", None)
+        elif similarity.simsimd is None:
+            pytest.skip("simsimd not installed")
+        
+        rng = np.random.default_rng(0)
+        query = rng.normal(size=16).astype(np.float32)
+        matrix = rng.normal(size=(5, 16)).astype(np.float32)
+        matrix[3] = 0.0
+        
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        expected = matrix @ query / np.where(norms == 0, 1.0, norms)
+        
+        result = similarity.cosine_batch(query, matrix)
+        
+        assert result.shape == (5,)
+        np.testing.assert_allclose(result, expected, atol=1e-4)
+        assert similarity.cosine_batch(query, np.empty((0, 16), dtype=np.float32)).shape == (0,)
+        
+        # Pre-normalized rows skip the per-row norms and give the same scores
+        unit = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        np.testing.assert_allclose(
+            similarity.cosine_batch(query, unit, normalized=True), expected, atol=1e-4
+        )
+
+
 # ==================== QUERY TRANSFORM TESTS ====================
 @pytest.mark.unit
 class TestQueryTransform:
@@ -401,3 +438,46 @@ class TestBaseClasses:
         from rag_chatbot.base import BaseChunker
         
         assert hasattr(BaseChunker, 'chunk')
+    
+    def test_documento_uses_slots(self):
+        """Test that Documento has no per-instance __dict__ but keeps dataclass behavior."""
+        import pickle
+        from rag_chatbot.interfaces import Documento
+        
+        doc = Documento(content="texto", metadata={"source": "a.txt"})
+        
+        assert not hasattr(doc, "__dict__")
+        assert doc == Documento("texto", {"source": "a.txt"})
+        assert pickle.loads(pickle.dumps(doc)) == doc
+
+
+# ==================== TEMPLATE TESTS ====================
+@pytest.mark.unit
+class TestTemplates:
+    """Tests for precompiled prompt templates."""
+    
+    @pytest.mark.parametrize("template", [
+        "CONTEXT:\n{context}\n\nQUESTION: {question}\nANSWER:",
+        "{question}{context}",
+        "Literal {{braces}} and {context}",
+        "No fields at all",
+        "Spec {context:>5} and {question!r}",
+    ])
+    def test_matches_str_format(self, template):
+        """Test that rendering matches str.format for every template shape."""
+        from rag_chatbot.templates import CompiledTemplate
+        
+        values = {"context": "ctx", "question": 42}
+        
+        assert CompiledTemplate(template).format(**values) == template.format(**values)
+    
+    def test_missing_field_and_cache(self):
+        """Test KeyError on a missing field and that templates are compiled once."""
+        from rag_chatbot.templates import compile_template
+        
+        template = compile_template("{context} / {question}")
+        
+        assert compile_template("{context} / {question}") is template
+        assert compile_template("Positional {0}")._parts is None  # Falls back to str.format
+        with pytest.raises(KeyError):
+            template.format(context="only context")
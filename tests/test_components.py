@@ -5,6 +5,8 @@ import tempfile
 import shutil
 from pathlib import Path
 
+import numpy as np
+
 from rag_chatbot.components.loaders import FolderLoader
 from rag_chatbot.components.embedders import MiniLMEmbedder
 from rag_chatbot.components.vector_stores import ChromaVectorStore
@@ -68,19 +70,21 @@ class TestMiniLMEmbedder:
         texts = ["Texto 1", "Texto 2", "Texto 3"]
         embeddings = embedder.embed_documents(texts)
         
-        assert len(embeddings) == 3
-        assert all(isinstance(emb, list) for emb in embeddings)
-        assert all(len(emb) > 0 for emb in embeddings)
-        assert all(isinstance(val, float) for emb in embeddings for val in emb)
+        assert isinstance(embeddings, np.ndarray)
+        assert embeddings.dtype == np.float32
+        assert embeddings.ndim == 2
+        assert embeddings.shape[0] == 3
+        assert embeddings.shape[1] > 0
     
     def test_embed_query(self, embedder):
         """Testa geração de embedding para uma query."""
         query = "Qual é a resposta?"
         embedding = embedder.embed_query(query)
         
-        assert isinstance(embedding, list)
+        assert isinstance(embedding, np.ndarray)
+        assert embedding.dtype == np.float32
+        assert embedding.ndim == 1
         assert len(embedding) > 0
-        assert all(isinstance(val, float) for val in embedding)
     
     def test_embeddings_consistency(self, embedder):
         """Testa que textos iguais geram embeddings iguais."""
@@ -88,19 +92,20 @@ class TestMiniLMEmbedder:
         emb1 = embedder.embed_query(text)
         emb2 = embedder.embed_query(text)
         
-        assert emb1 == emb2
+        np.testing.assert_array_equal(emb1, emb2)
 
 
 class TestChromaVectorStore:
     """Testes para ChromaVectorStore."""
     
     @pytest.fixture
-    def store(self):
-        """Cria uma instância in-memory do vector store com nome único."""
+    def store(self, tmp_path):
+        """Cria uma instância do vector store com nome e diretório únicos."""
         import uuid
-        # Usar nome único para evitar conflito entre testes
+        # Nome único e diretório temporário por teste: workers paralelos do
+        # pytest-xdist não compartilham o banco SQLite do ChromaDB
         unique_name = f"test_collection_{uuid.uuid4().hex[:8]}"
-        return ChromaVectorStore(collection_name=unique_name)
+        return ChromaVectorStore(collection_name=unique_name, persist_directory=str(tmp_path))
     
     def test_add_and_search(self, store):
         """Testa adição e busca de documentos."""
@@ -132,12 +137,12 @@ class TestChromaVectorStore:
         store.add([], [])
         # Não deve causar erro
     
-    def test_search_empty_store(self):
+    def test_search_empty_store(self, tmp_path):
         """Testa busca em store vazio."""
         import uuid
         # Criar store com nome único para garantir que está vazio
         unique_name = f"test_empty_{uuid.uuid4().hex[:8]}"
-        empty_store = ChromaVectorStore(collection_name=unique_name)
+        empty_store = ChromaVectorStore(collection_name=unique_name, persist_directory=str(tmp_path))
         
         results = empty_store.search([0.1, 0.2, 0.3], k=5)
         
@@ -202,7 +207,7 @@ class TestIntegration:
         
         shutil.rmtree(temp_dir)
     
-    def test_full_rag_flow(self, temp_data_dir):
+    def test_full_rag_flow(self, temp_data_dir, tmp_path):
         """Testa o fluxo completo: carregar -> embedar -> armazenar -> buscar."""
         from rag_chatbot.core import RAGChatbot
         import uuid
@@ -212,7 +217,7 @@ class TestIntegration:
         embedder = MiniLMEmbedder()
         # Usar nome único para evitar conflito entre execuções
         unique_name = f"integration_test_{uuid.uuid4().hex[:8]}"
-        store = ChromaVectorStore(collection_name=unique_name)
+        store = ChromaVectorStore(collection_name=unique_name, persist_directory=str(tmp_path))
         llm = MockLLM(default_response="O cachorro é marrom.")
         
         # Criar chatbot
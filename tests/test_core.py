@@ -16,6 +16,7 @@ class TestRAGChatbot:
         mock_loader = Mock()
         mock_embedder = Mock()
         mock_store = Mock()
+        mock_store.missing_documents.side_effect = list
         mock_llm = Mock()
         
         return {
@@ -55,6 +56,50 @@ class TestRAGChatbot:
         mock_components['embedder'].embed_documents.assert_called_once()
         mock_components['store'].add.assert_called_once()
     
+    def test_ingest_data_in_batches(self, mock_components):
+        """Testa que a ingestão embeda e grava em lotes, na ordem."""
+        test_docs = [Documento(content=f"Doc {i}", metadata={"id": i}) for i in range(5)]
+        mock_components['loader'].load.return_value = test_docs
+        mock_components['embedder'].embed_documents.side_effect = (
+            lambda texts: [[float(len(text))] for text in texts]
+        )
+        
+        chatbot = RAGChatbot(
+            loader=mock_components['loader'],
+            embedder=mock_components['embedder'],
+            store=mock_components['store'],
+            llm=mock_components['llm'],
+            ingest_batch_size=2
+        )
+        
+        assert chatbot.ingest_data("/fake/path") == 5
+        
+        batches = [call.args[0] for call in mock_components['store'].add.call_args_list]
+        assert batches == [test_docs[0:2], test_docs[2:4], test_docs[4:5]]
+        assert mock_components['embedder'].embed_documents.call_count == 3
+    
+    def test_ingest_data_skips_indexed_chunks_before_embedding(self, chatbot, mock_components):
+        """Testa que chunks já no store não são embedados e que os antigos são removidos."""
+        test_docs = [Documento(content=f"Doc {i}", metadata={"path": "/a.txt"}) for i in range(3)]
+        mock_components['loader'].load.return_value = test_docs
+        mock_components['store'].missing_documents.side_effect = lambda docs: docs[1:]
+        mock_components['embedder'].embed_documents.return_value = [[0.1], [0.2]]
+        
+        assert chatbot.ingest_data("/fake/path") == 3
+        
+        mock_components['embedder'].embed_documents.assert_called_once_with(["Doc 1", "Doc 2"])
+        assert mock_components['store'].add.call_args.args[0] == test_docs[1:]
+        mock_components['store'].remove_stale.assert_called_once_with(test_docs)
+    
+    def test_ingest_data_propagates_store_errors(self, chatbot, mock_components):
+        """Testa que falhas na gravação interrompem a ingestão."""
+        mock_components['loader'].load.return_value = [Documento(content="Doc", metadata={})]
+        mock_components['embedder'].embed_documents.return_value = [[0.1]]
+        mock_components['store'].add.side_effect = IOError("disco cheio")
+        
+        with pytest.raises(IOError):
+            chatbot.ingest_data("/fake/path")
+    
     def test_ingest_data_no_documents(self, chatbot, mock_components):
         """Testa ingestão quando não há documentos."""
         mock_components['loader'].load.return_value = []
@@ -121,6 +166,36 @@ class TestRAGChatbot:
         assert sources == expected_docs
         mock_components['store'].search.assert_called_once_with([0.5, 0.6], k=2)
     
+    def test_get_sources_reuses_question_embedding(self, chatbot, mock_components):
+        """Testa que ask seguido de get_sources embeda a pergunta uma só vez."""
+        mock_components['embedder'].embed_query.return_value = [0.5, 0.6]
+        mock_components['store'].search.return_value = []
+        mock_components['llm'].generate.return_value = "Resposta"
+        
+        chatbot.ask("Mesma pergunta", k=2)
+        chatbot.get_sources("Mesma pergunta", k=2)
+        chatbot.get_sources("Outra pergunta", k=2)
+        
+        assert mock_components['embedder'].embed_query.call_count == 2
+        assert mock_components['store'].search.call_count == 3
+    
+    def test_no_question_cache_when_embedder_caches(self, mock_components):
+        """Testa que o chatbot não empilha um cache sobre o do embedder."""
+        mock_components['embedder'].caches_queries = True
+        mock_components['embedder'].embed_query.return_value = [0.5, 0.6]
+        mock_components['store'].search.return_value = []
+        
+        chatbot = RAGChatbot(
+            loader=mock_components['loader'],
+            embedder=mock_components['embedder'],
+            store=mock_components['store'],
+            llm=mock_components['llm']
+        )
+        chatbot.get_sources("Mesma pergunta", k=2)
+        chatbot.get_sources("Mesma pergunta", k=2)
+        
+        assert mock_components['embedder'].embed_query.call_count == 2
+    
     def test_ask_with_image(self, chatbot, mock_components):
         """Testa geração de resposta com imagem."""
         # Configurar mocks
@@ -140,6 +215,35 @@ class TestRAGChatbot:
         assert call_args[1]['images_base64'] is not None
         assert len(call_args[1]['images_base64']) == 1
     
+    def test_ask_stream(self, chatbot, mock_components):
+        """Testa que ask_stream repassa os pedaços gerados pelo LLM."""
+        mock_components['embedder'].embed_query.return_value = [0.5, 0.6]
+        mock_components['store'].search.return_value = [
+            Documento(content="Contexto", metadata={"source": "a.txt"})
+        ]
+        mock_components['llm'].generate_stream.return_value = iter(["Res", "posta"])
+        
+        chunks = list(chatbot.ask_stream("Pergunta", k=1))
+        
+        assert chunks == ["Res", "posta"]
+        prompt = mock_components['llm'].generate_stream.call_args[0][0]
+        assert "Contexto" in prompt and "Pergunta" in prompt
+        mock_components['llm'].generate.assert_not_called()
+    
+    def test_image_base64_encoding_is_cached(self):
+        """Testa que a mesma imagem é codificada uma vez e o resultado é correto."""
+        import base64
+        from rag_chatbot.core import _encode_image, _encode_image_cached
+        
+        _encode_image_cached.cache_clear()
+        image_data = b"\x89PNG fake image"
+        expected = base64.b64encode(image_data).decode('utf-8')
+        
+        assert _encode_image(image_data) == expected
+        assert _encode_image(bytes(image_data)) == expected
+        assert _encode_image(bytearray(image_data)) == expected
+        assert _encode_image_cached.cache_info().hits == 1
+    
     def test_ask_with_chat_history(self, chatbot, mock_components):
         """Testa geração de resposta com histórico de conversa."""
         # Configurar mocks
@@ -171,6 +275,20 @@ class TestRAGChatbot:
         assert "Segunda pergunta" in prompt
         assert "HISTÓRICO" in prompt
     
+    def test_create_prompt_with_history_formatting(self, chatbot):
+        """Testa rótulos de papéis e mensagens ignoradas no histórico."""
+        prompt = chatbot._create_prompt_with_history("ctx", "pergunta", [
+            {"role": "system", "content": "Instrução interna"},
+            {"role": "user", "content": "Oi"},
+            {"role": "assistant", "content": "Olá!"},
+        ])
+        
+        assert "Usuário: Oi\nAssistente: Olá!" in prompt
+        assert "Instrução interna" not in prompt
+        
+        empty = chatbot._create_prompt_with_history("ctx", "pergunta", [{"role": "system", "content": "x"}])
+        assert "Nenhum histórico." in empty
+    
     def test_ingest_with_text_splitter(self, mock_components):
         """Testa ingestão com text splitter."""
         from unittest.mock import Mock
@@ -1,5 +1,6 @@
 """Comprehensive unit tests for embedders."""
 
+import numpy as np
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from rag_chatbot.components.embedders import MiniLMEmbedder
@@ -43,7 +44,9 @@ class TestMiniLMEmbedder:
         
         # Verify encode was called
         mock_sentence_transformer.encode.assert_called_once_with(texts)
-        assert result == [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
+        assert result.dtype == np.float32
+        assert result.shape == (2, 3)
+        np.testing.assert_allclose(result, [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]], rtol=1e-6)
     
     def test_embed_documents_empty_list(self, mock_sentence_transformer):
         """Test embedding empty list."""
@@ -66,7 +69,8 @@ class TestMiniLMEmbedder:
         result = embedder.embed_query(query)
         
         mock_sentence_transformer.encode.assert_called_once_with([query])
-        assert result == [0.1, 0.2, 0.3]
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, [0.1, 0.2, 0.3], rtol=1e-6)
     
     def test_embed_query_special_characters(self, mock_sentence_transformer):
         """Test embedding query with special characters."""
@@ -78,7 +82,7 @@ class TestMiniLMEmbedder:
         
         result = embedder.embed_query(query)
         
-        assert result == [0.7, 0.8, 0.9]
+        np.testing.assert_allclose(result, [0.7, 0.8, 0.9], rtol=1e-6)
     
     def test_embed_documents_unicode(self, mock_sentence_transformer):
         """Test embedding documents with Unicode characters."""
@@ -94,3 +98,109 @@ class TestMiniLMEmbedder:
         result = embedder.embed_documents(texts)
         
         assert len(result) == 2
+    
+    def test_embed_query_cached(self, mock_sentence_transformer):
+        """Test that repeated queries reuse the cached embedding."""
+        mock_sentence_transformer.encode.return_value = np.array([[0.1, 0.2, 0.3]])
+        
+        embedder = MiniLMEmbedder()
+        first = embedder.embed_query("Same question")
+        with pytest.raises(ValueError):
+            first[0] = 99.0  # Cached arrays are read-only
+        second = embedder.embed_query("Same question")
+        
+        np.testing.assert_allclose(second, [0.1, 0.2, 0.3], rtol=1e-6)
+        mock_sentence_transformer.encode.assert_called_once_with(["Same question"])
+    
+    def test_embed_query_cache_disabled(self, mock_sentence_transformer):
+        """Test that query_cache_size=0 disables caching."""
+        mock_sentence_transformer.encode.return_value = np.array([[0.1, 0.2, 0.3]])
+        
+        embedder = MiniLMEmbedder(query_cache_size=0)
+        embedder.embed_query("Same question")
+        embedder.embed_query("Same question")
+        
+        assert mock_sentence_transformer.encode.call_count == 2
+
+
+class TestBatchingEmbedder:
+    """Test suite for BatchingEmbedder."""
+    
+    def test_concurrent_queries_share_a_batch(self):
+        """Test that concurrent embed_query calls are coalesced."""
+        import threading
+        from rag_chatbot.batching import BatchingEmbedder
+        
+        inner = Mock()
+        inner.embed_documents.side_effect = lambda texts: np.array(
+            [[float(len(text)), 1.0] for text in texts]
+        )
+        embedder = BatchingEmbedder(inner, max_batch_size=8, max_wait=0.5)
+        
+        texts = [f"question {'x' * i}" for i in range(8)]
+        results = {}
+        start = threading.Barrier(len(texts))
+        
+        def ask(text):
+            start.wait()
+            results[text] = embedder.embed_query(text)
+        
+        threads = [threading.Thread(target=ask, args=(text,)) for text in texts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        embedder.close()
+        
+        # All short queries land in the same bucket and fill one batch
+        inner.embed_documents.assert_called_once()
+        for text in texts:
+            np.testing.assert_allclose(results[text], [len(text), 1.0])
+    
+    def test_lone_query_flushes_after_deadline_and_errors_propagate(self):
+        """Test single-query latency bound and error propagation."""
+        from rag_chatbot.batching import BatchingEmbedder
+        
+        inner = Mock()
+        inner.embed_documents.return_value = np.array([[0.1, 0.2]])
+        embedder = BatchingEmbedder(inner, max_batch_size=32, max_wait=0.001)
+        
+        np.testing.assert_allclose(embedder.embed_query("Hi"), [0.1, 0.2], rtol=1e-6)
+        
+        inner.embed_documents.side_effect = RuntimeError("model crashed")
+        with pytest.raises(RuntimeError, match="model crashed"):
+            embedder.embed_query("Hi again")
+        
+        embedder.close()
+        with pytest.raises(RuntimeError):
+            embedder.embed_query("After close")
+    
+    def test_results_are_read_only_and_worker_death_fails_callers(self):
+        """Test that batch rows are read-only and callers don't hang if the worker stops."""
+        from rag_chatbot.batching import BatchingEmbedder
+        
+        inner = Mock()
+        inner.embed_documents.return_value = np.array([[0.1, 0.2]])
+        embedder = BatchingEmbedder(inner, max_batch_size=32, max_wait=0.001)
+        
+        result = embedder.embed_query("Hi")
+        with pytest.raises(ValueError):
+            result[0] = 99.0
+        
+        # SystemExit ends the worker thread without going through the error path
+        inner.embed_documents.side_effect = SystemExit
+        with pytest.raises(RuntimeError, match="worker stopped"):
+            embedder.embed_query("Hi again")
+        embedder._worker.join(timeout=5)
+        with pytest.raises(RuntimeError):
+            embedder.embed_query("After the worker died")
+    
+    def test_buckets_by_length(self):
+        """Test that queries are bucketed by approximate token count."""
+        from rag_chatbot.batching import BatchingEmbedder
+        
+        embedder = BatchingEmbedder(Mock())
+        assert embedder._bucket_for("short") == 16
+        assert embedder._bucket_for("x" * 400) == 128
+        assert embedder._bucket_for("x" * 100000) == 512
+        embedder.close()
@@ -49,6 +49,41 @@ class TestOllamaLLM:
         
         assert result == 'Response with image analysis'
     
+    def test_generate_with_system_prompt(self, mock_ollama_client):
+        """Test that the system prompt is sent in Ollama's system field."""
+        mock_ollama_client.generate.return_value = {'response': 'ok'}
+        
+        llm = OllamaLLM()
+        llm.generate("User prompt", system="You are a Researcher.")
+        
+        params = mock_ollama_client.generate.call_args.kwargs
+        assert params["prompt"] == "User prompt"
+        assert params["system"] == "You are a Researcher."
+    
+    def test_generate_stream(self, mock_ollama_client):
+        """Test streaming generation yields Ollama's chunks in order."""
+        mock_ollama_client.generate.return_value = iter([
+            {'response': 'Hel'}, {'response': ''}, {'response': 'lo'}
+        ])
+        
+        llm = OllamaLLM()
+        chunks = list(llm.generate_stream("Test prompt", system="Be brief."))
+        
+        assert chunks == ['Hel', 'lo']
+        params = mock_ollama_client.generate.call_args.kwargs
+        assert params["stream"] is True
+        assert params["system"] == "Be brief."
+    
+    def test_generate_stream_error_handling(self, mock_ollama_client):
+        """Test streaming generation reports connection errors as text."""
+        mock_ollama_client.generate.side_effect = Exception("Connection error")
+        
+        llm = OllamaLLM()
+        chunks = list(llm.generate_stream("Test prompt"))
+        
+        assert len(chunks) == 1
+        assert "Erro" in chunks[0]
+    
     def test_generate_empty_prompt(self, mock_ollama_client):
         """Test generation with empty prompt."""
         mock_response = {'response': ''}
@@ -93,6 +128,12 @@ class TestMockLLM:
         
         assert result == "Esta é uma resposta mock do LLM."
     
+    def test_generate_stream_default(self):
+        """Test that the default generate_stream yields the whole response."""
+        llm = MockLLM(default_response="Streamed")
+        
+        assert list(llm.generate_stream("Any prompt")) == ["Streamed"]
+    
     def test_generate_custom_response(self):
         """Test custom mock response."""
         custom_response = "Custom test response"
@@ -145,3 +145,27 @@ class TestUniversalLoader:
             assert len(documents) >= 2  # .txt e .md devem ter sido carregados
         except Exception as e:
             pytest.fail(f"Loader não tratou erro adequadamente: {e}")
+    
+    def test_parallel_load_many_files(self, temp_data_dir):
+        """Testa carregamento paralelo de muitos arquivos com ordem estável."""
+        for i in range(20):
+            (Path(temp_data_dir) / f"extra_{i:02d}.txt").write_text(f"Arquivo {i}", encoding='utf-8')
+        
+        serial = UniversalLoader(max_workers=1).load(temp_data_dir)
+        parallel = UniversalLoader(max_workers=8).load(temp_data_dir)
+        
+        assert len(parallel) == 22
+        assert [d.metadata['path'] for d in parallel] == [d.metadata['path'] for d in serial]
+        assert [d.content for d in parallel] == [d.content for d in serial]
+    
+    def test_suffix_dispatch_and_missing_dir(self, temp_data_dir):
+        """Testa extensões em maiúsculas, arquivos ignorados e pasta inexistente."""
+        (Path(temp_data_dir) / "UPPER.TXT").write_text("Maiúsculas", encoding='utf-8')
+        (Path(temp_data_dir) / "ignorado.csv").write_text("a,b", encoding='utf-8')
+        (Path(temp_data_dir) / "subpasta.txt").mkdir()
+        
+        documents = UniversalLoader().load(temp_data_dir)
+        sources = sorted(d.metadata['source'] for d in documents)
+        
+        assert sources == ["UPPER.TXT", "test1.txt", "test2.md"]
+        assert UniversalLoader().load(str(Path(temp_data_dir) / "nao_existe")) == []
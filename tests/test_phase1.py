@@ -1,12 +1,13 @@
 """Tests for Phase 1 components: base classes, pipeline, chunking, and retrieval."""
 
+import numpy as np
 import pytest
 from unittest.mock import Mock, MagicMock
 from rag_chatbot.base import BaseComponent, BaseChunker, BaseRetriever, BaseReRanker, BaseGenerator
 from rag_chatbot.pipeline import Pipeline
 from rag_chatbot.chunking import SemanticChunker, split_into_sentences, cosine_similarity
 from rag_chatbot.retrieval import HybridRetriever, VectorRetriever, BM25Retriever
-from rag_chatbot.interfaces import Documento
+from rag_chatbot.interfaces import Documento, RetrievalResult
 
 
 class TestBaseComponent:
@@ -110,6 +111,71 @@ class TestPipeline:
         mock_components['reranker'].rerank.assert_called_once()
         mock_components['generator'].generate.assert_called_once()
     
+    def test_pipeline_arun(self, mock_components):
+        """Test async execution warms up the generator and matches run()."""
+        import asyncio
+        
+        test_docs = [Documento(content="Async doc", metadata={"id": "1"})]
+        mock_components['retriever'].retrieve.return_value = test_docs
+        mock_components['generator'].generate.return_value = "Async response"
+        
+        pipeline = Pipeline(
+            retriever=mock_components['retriever'],
+            generator=mock_components['generator']
+        )
+        
+        async def run_both():
+            return await asyncio.gather(
+                pipeline.arun("test query", top_k=3, top_n=1),
+                pipeline.aget_sources("test query", top_k=3, top_n=1),
+            )
+        
+        response, sources = asyncio.run(run_both())
+        
+        assert response == "Async response"
+        assert sources == test_docs
+        mock_components['generator'].warmup.assert_called_once()
+        assert "Async doc" in mock_components['generator'].generate.call_args[0][0]
+    
+    def test_pipeline_prefilter_before_rerank(self, mock_components):
+        """Test that low retrieval scores are dropped before re-ranking."""
+        scores = np.array([0.9, 0.85, 0.8, 0.75, 0.1], dtype=np.float32)
+        retrieved_docs = [Documento(content=f"Doc {i}", metadata={}) for i in range(len(scores))]
+        mock_components['retriever'].retrieve_with_scores.return_value = RetrievalResult(
+            retrieved_docs, scores
+        )
+        mock_components['reranker'].rerank.side_effect = lambda query, docs, top_n: docs[:top_n]
+        
+        pipeline = Pipeline(
+            retriever=mock_components['retriever'],
+            generator=mock_components['generator'],
+            reranker=mock_components['reranker'],
+            prefilter_std=1.0
+        )
+        
+        pipeline.get_sources("test query", top_k=5, top_n=2)
+        assert mock_components['reranker'].rerank.call_args[0][1] == retrieved_docs[:4]
+        
+        # At least top_n candidates always reach the reranker
+        pipeline.get_sources("test query", top_k=5, top_n=5)
+        assert mock_components['reranker'].rerank.call_args[0][1] == retrieved_docs
+    
+    def test_vector_retriever_with_scores(self):
+        """Test that VectorRetriever returns scores without touching stored documents."""
+        from rag_chatbot.components.vector_stores import InMemoryVectorStore
+        
+        store = InMemoryVectorStore()
+        store.add([Documento("a", {}), Documento("b", {})], [[1.0, 0.0], [0.0, 1.0]])
+        mock_embedder = Mock()
+        mock_embedder.embed_query.return_value = [1.0, 0.0]
+        
+        retriever = VectorRetriever(vector_store=store, embedder=mock_embedder)
+        result = retriever.retrieve_with_scores("query", top_k=2)
+        
+        assert [doc.content for doc in result.documents] == ["a", "b"]
+        assert result.scores.tolist() == pytest.approx([1.0, 0.0])
+        assert all(doc.metadata == {} for doc in store.documents)
+    
     def test_pipeline_get_sources(self, mock_components):
         """Test getting source documents without generation."""
         test_docs = [
@@ -131,6 +197,26 @@ class TestPipeline:
         assert sources[0].content == "Source 1"
         # Generator should not be called
         mock_components['generator'].generate.assert_not_called()
+    
+    def test_pipeline_run_stream(self, mock_components):
+        """Test streaming execution and the no-documents short circuit."""
+        mock_components['retriever'].retrieve.return_value = [
+            Documento(content="Streamed doc", metadata={"id": "1"})
+        ]
+        mock_components['generator'].generate_stream.return_value = iter(["Hel", "lo"])
+        
+        pipeline = Pipeline(
+            retriever=mock_components['retriever'],
+            generator=mock_components['generator']
+        )
+        
+        assert list(pipeline.run_stream("test query")) == ["Hel", "lo"]
+        prompt = mock_components['generator'].generate_stream.call_args[0][0]
+        assert "Streamed doc" in prompt
+        mock_components['generator'].generate.assert_not_called()
+        
+        mock_components['retriever'].retrieve.return_value = []
+        assert list(pipeline.run_stream("test query")) == [Pipeline.NO_CONTEXT_RESPONSE]
 
 
 class TestSemanticChunker:
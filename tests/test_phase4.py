@@ -1,6 +1,7 @@
 """Tests for Phase 4 components: crew orchestration and routing."""
 
 import pytest
+from collections import OrderedDict
 from unittest.mock import Mock, MagicMock
 from rag_chatbot.crew import CrewAgent, Task, Crew, ProcessType
 from rag_chatbot.routing import Router, RoutingStrategy
@@ -48,6 +49,81 @@ class TestCrewAgent:
         
         assert "Research completed" in result
         mock_llm.generate.assert_called_once()
+        
+        # Static agent description goes in the system prompt, task in the user prompt
+        prompt = mock_llm.generate.call_args.args[0]
+        system = mock_llm.generate.call_args.kwargs["system"]
+        assert system == agent.system_prompt()
+        assert "Researcher" in system and "Research Python" not in system
+        assert "Research Python programming" in prompt and "Expert researcher" not in prompt
+        assert prompt.startswith("Task: ")
+    
+    def test_crew_agent_exact_cache(self):
+        """Test that cache_mode='exact' reuses responses for repeated prompts."""
+        mock_llm = Mock()
+        mock_llm.generate.return_value = "Cached answer"
+        
+        agent = CrewAgent(
+            role="Researcher",
+            goal="Research topics",
+            backstory="Expert researcher",
+            tools=[],
+            llm=mock_llm,
+            cache_mode="exact"
+        )
+        task = Task(description="Research Python", expected_output="Summary", agent=agent)
+        other = Task(description="Research Rust", expected_output="Summary", agent=agent)
+        
+        assert agent.execute(task) == "Cached answer"
+        assert agent.execute(task) == "Cached answer"
+        assert mock_llm.generate.call_count == 1
+        
+        agent.execute(other)
+        assert mock_llm.generate.call_count == 2
+        
+        # Expired entries are regenerated
+        agent.cache_ttl = 0
+        agent._response_cache = OrderedDict(
+            (key, (0.0, value)) for key, value in agent._response_cache.items()
+        )
+        agent.execute(task)
+        assert mock_llm.generate.call_count == 3
+    
+    def test_crew_agent_cache_is_bounded(self):
+        """Test that the response cache evicts the least recently used entry."""
+        mock_llm = Mock()
+        mock_llm.generate.side_effect = lambda prompt, system: prompt
+        
+        agent = CrewAgent(
+            role="Researcher",
+            goal="Research topics",
+            backstory="Expert researcher",
+            tools=[],
+            llm=mock_llm,
+            cache_mode="exact",
+            cache_max_entries=2
+        )
+        tasks = [
+            Task(description=f"Research {topic}", expected_output="Summary", agent=agent)
+            for topic in ("Python", "Rust", "Go")
+        ]
+        
+        agent.execute(tasks[0])
+        agent.execute(tasks[1])
+        agent.execute(tasks[0])  # Python is now the most recently used
+        agent.execute(tasks[2])  # evicts Rust
+        assert len(agent._response_cache) == 2
+        assert mock_llm.generate.call_count == 3
+        
+        agent.execute(tasks[0])
+        assert mock_llm.generate.call_count == 3
+        agent.execute(tasks[1])
+        assert mock_llm.generate.call_count == 4
+    
+    def test_crew_agent_invalid_cache_mode(self):
+        """Test that an unknown cache_mode is rejected."""
+        with pytest.raises(ValueError):
+            CrewAgent(role="R", goal="G", backstory="B", tools=[], cache_mode="semantic")
     
     def test_crew_agent_execute_without_llm(self):
         """Test agent executing without LLM (placeholder mode)."""
@@ -159,6 +235,37 @@ class TestCrew:
         # Result should be from last task
         assert "Article" in result or "Python Programming" in result
     
+    def test_sequential_parallel_independent_tasks(self):
+        """Test that consecutive tasks not using context run in parallel."""
+        import threading
+        
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def wait_for_peer(prompt, system=None):
+            barrier.wait()  # Deadlocks (times out) unless both run concurrently
+            return f"done: {prompt.split('Task: ')[1].splitlines()[0]}"
+        
+        fetch_llm = Mock()
+        fetch_llm.generate.side_effect = wait_for_peer
+        summary_llm = Mock()
+        summary_llm.generate.return_value = "Summary"
+        
+        fetcher = CrewAgent(role="Fetcher", goal="Fetch", backstory="Tool user", tools=[], llm=fetch_llm)
+        writer = CrewAgent(role="Writer", goal="Write", backstory="Writer", tools=[], llm=summary_llm)
+        
+        tasks = [
+            Task("Fetch A", "A", fetcher, uses_context=False),
+            Task("Fetch B", "B", fetcher, uses_context=False),
+            Task("Summarize", "Summary", writer),
+        ]
+        crew = Crew(agents=[fetcher, writer], tasks=tasks, max_parallel=2)
+        
+        assert crew.kickoff() == "Summary"
+        
+        # Parallel outputs reach the next task's context in task order
+        summary_prompt = summary_llm.generate.call_args.args[0]
+        assert summary_prompt.index("done: Fetch A") < summary_prompt.index("done: Fetch B")
+    
     def test_hierarchical_workflow(self):
         """Test hierarchical task execution with dependencies."""
         # Create agents
@@ -299,6 +406,33 @@ class TestRouter:
         # Should select simple model based on classification
         assert selected_llm == mock_llms["simple"]
     
+    def test_llm_judge_classification_is_cached(self, mock_llms):
+        """Test that repeated and near-identical queries reuse the judge's decision."""
+        import numpy as np
+        
+        mock_llms["router"].generate.return_value = "complex"
+        router = Router(models=mock_llms, judge_cache_size=1)
+        
+        assert router.route("Compare X and Y", strategy=RoutingStrategy.LLM_JUDGE) == mock_llms["complex"]
+        assert router.route("compare x  and y", strategy=RoutingStrategy.LLM_JUDGE) == mock_llms["complex"]
+        assert mock_llms["router"].generate.call_count == 1
+        
+        # The oldest entry is evicted once the cache is full
+        router.route("Other query", strategy=RoutingStrategy.LLM_JUDGE)
+        router.route("Compare X and Y", strategy=RoutingStrategy.LLM_JUDGE)
+        assert mock_llms["router"].generate.call_count == 3
+        
+        # With an embedder, queries with the same embedding sign pattern share a key
+        mock_embedder = Mock()
+        mock_embedder.embed_documents.return_value = np.eye(4, dtype=np.float32)
+        mock_embedder.embed_query.side_effect = lambda text: (
+            np.array([0.9, -0.2, 0.1, 0.3]) if "X" in text else np.array([0.5, -0.1, 0.4, 0.2])
+        )
+        semantic_router = Router(models=mock_llms, embedder=mock_embedder)
+        semantic_router.route("Compare X and Y", strategy=RoutingStrategy.LLM_JUDGE)
+        semantic_router.route("Contrast A and B", strategy=RoutingStrategy.LLM_JUDGE)
+        assert mock_llms["router"].generate.call_count == 4
+    
     def test_semantic_routing_with_embedder(self, mock_llms):
         """Test semantic routing with embeddings."""
         mock_embedder = Mock()
@@ -321,6 +455,34 @@ class TestRouter:
         # Should call embedder
         mock_embedder.embed_query.assert_called_once()
     
+    def test_semantic_routing_picks_closest_category(self, mock_llms):
+        """Test that semantic routing selects the most similar category."""
+        import numpy as np
+        
+        centroids = {
+            "What is X?": [1.0, 0.0, 0.0],
+            "Analyze the trade-offs between X and Y": [0.0, 3.0, 0.0],
+            "Write a story about X": [0.0, 0.0, 1.0],
+        }
+        mock_embedder = Mock()
+        mock_embedder.embed_documents.side_effect = lambda texts: np.array(
+            [centroids.get(texts[0], [0.0, 0.0, 0.0])] * len(texts)
+        )
+        # Closest to "simple" by angle, although the larger "complex" centroid
+        # would win on a raw dot product
+        mock_embedder.embed_query.return_value = np.array([0.6, 0.5, 0.1], dtype=np.float32)
+        
+        router = Router(models=mock_llms, embedder=mock_embedder)
+        
+        assert router._cat_matrix.shape == (3, 3)
+        np.testing.assert_allclose(np.linalg.norm(router._cat_matrix, axis=1), 1.0, rtol=1e-5)
+        assert router.route("Query", strategy=RoutingStrategy.SEMANTIC) == mock_llms["simple"]
+        
+        # The int8-quantized path agrees with the float32 one
+        quantized = Router(models=mock_llms, embedder=mock_embedder, quantize_int8=True)
+        assert quantized._cat_matrix_i8.dtype == np.int8
+        assert quantized.route("Query", strategy=RoutingStrategy.SEMANTIC) == mock_llms["simple"]
+    
     def test_semantic_routing_fallback(self, mock_llms):
         """Test semantic routing falls back when no embedder."""
         router = Router(models=mock_llms, embedder=None)
@@ -331,6 +493,13 @@ class TestRouter:
         # Should fall back to rule-based
         assert selected_llm in mock_llms.values()
     
+    def test_unknown_strategy_raises(self, mock_llms):
+        """Test that an unknown strategy is rejected."""
+        router = Router(models=mock_llms)
+        
+        with pytest.raises(ValueError):
+            router.route("Query", strategy="semantic")
+    
     def test_run_method(self, mock_llms):
         """Test run() method."""
         router = Router(models=mock_llms)
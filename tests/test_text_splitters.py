@@ -143,3 +143,13 @@ class TestRecursiveCharacterTextSplitter:
         # Verificar que a divisão ocorreu
         for chunk in chunks:
             assert len(chunk.content) > 0
+    
+    def test_separator_priority(self):
+        """Testa que o separador de maior prioridade vence, mesmo aparecendo depois."""
+        splitter = RecursiveCharacterTextSplitter(chunk_size=20, chunk_overlap=0)
+        
+        # Espaços aparecem antes do primeiro "\n\n", mas "\n\n" tem prioridade
+        content = "um dois tres quatro\n\ncinco seis sete oito"
+        
+        chunks = splitter._split_text(content)
+        assert chunks == ["um dois tres quatro", "cinco seis sete oito"]
@@ -1,8 +1,9 @@
 """Comprehensive unit tests for vector stores."""
 
+import numpy as np
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from rag_chatbot.components.vector_stores import ChromaVectorStore
+from rag_chatbot.components.vector_stores import ChromaVectorStore, InMemoryVectorStore
 from rag_chatbot.interfaces import Documento
 
 
@@ -55,6 +56,8 @@ class TestChromaVectorStore:
         call_args = mock_collection.upsert.call_args[1]
         assert len(call_args['documents']) == 2
         assert len(call_args['embeddings']) == 2
+        # Chroma receives plain lists, accepted by every supported version
+        assert isinstance(call_args['embeddings'], list)
     
     def test_add_documents_empty_list(self, mock_chroma_client):
         """Test adding empty list of documents."""
@@ -117,6 +120,46 @@ class TestChromaVectorStore:
         
         assert len(results) == 0
     
+    def test_search_batch_single_query_call(self, mock_chroma_client):
+        """Test that search_batch sends all queries in one collection.query call."""
+        _, mock_collection = mock_chroma_client
+        
+        mock_collection.query.return_value = {
+            'documents': [['Doc 1', 'Doc 2'], ['Doc 3']],
+            'metadatas': [[{'source': 'a.txt'}, {'source': 'b.txt'}], [{'source': 'c.txt'}]],
+            'distances': [[0.1, 0.2], [0.3]]
+        }
+        
+        store = ChromaVectorStore()
+        results = store.search_batch([[0.1, 0.2], [0.3, 0.4]], k=2)
+        
+        assert [len(r) for r in results] == [2, 1]
+        assert results[1][0].content == 'Doc 3'
+        assert results[1][0].metadata['source'] == 'c.txt'
+        mock_collection.query.assert_called_once()
+        call_args = mock_collection.query.call_args[1]
+        assert call_args['n_results'] == 2
+        np.testing.assert_allclose(call_args['query_embeddings'], [[0.1, 0.2], [0.3, 0.4]], rtol=1e-6)
+        
+        assert store.search_batch([], k=2) == []
+        assert mock_collection.query.call_count == 1
+    
+    def test_search_with_scores(self, mock_chroma_client):
+        """Test that scores are the negated Chroma distances, aligned with documents."""
+        _, mock_collection = mock_chroma_client
+        
+        mock_collection.query.return_value = {
+            'documents': [['Doc 1', 'Doc 2']],
+            'metadatas': [[{'source': 'a.txt'}, {'source': 'b.txt'}]],
+            'distances': [[0.1, 0.4]]
+        }
+        
+        result = ChromaVectorStore().search_with_scores([0.1, 0.2], k=2)
+        
+        assert [doc.content for doc in result.documents] == ['Doc 1', 'Doc 2']
+        np.testing.assert_allclose(result.scores, [-0.1, -0.4], rtol=1e-6)
+        assert 'distances' in mock_collection.query.call_args[1]['include']
+    
     def test_count_documents(self, mock_chroma_client):
         """Test counting documents in collection."""
         _, mock_collection = mock_chroma_client
@@ -167,3 +210,173 @@ class TestChromaVectorStore:
         
         call_args = mock_collection.upsert.call_args[1]
         assert call_args['metadatas'][0]['author'] == 'John Doe'
+    
+    def test_generate_doc_id_depends_on_content(self, mock_chroma_client):
+        """Test that chunks of the same file get distinct, content-based IDs."""
+        store = ChromaVectorStore()
+        
+        chunk1 = Documento(content="Chunk 1", metadata={"path": "/a.txt"})
+        chunk2 = Documento(content="Chunk 2", metadata={"path": "/a.txt"})
+        same_content_other_file = Documento(content="Chunk 1", metadata={"path": "/b.txt"})
+        
+        ids = {store._generate_doc_id(d) for d in (chunk1, chunk2, same_content_other_file)}
+        assert len(ids) == 3
+        assert store._generate_doc_id(chunk1) == store._generate_doc_id(
+            Documento(content="Chunk 1", metadata={"path": "/a.txt"})
+        )
+    
+    def test_add_skips_existing_and_duplicate_documents(self, mock_chroma_client):
+        """Test that unchanged and repeated chunks are not upserted again."""
+        _, mock_collection = mock_chroma_client
+        
+        store = ChromaVectorStore()
+        
+        old = Documento(content="Old", metadata={"path": "/a.txt"})
+        new = Documento(content="New", metadata={"path": "/a.txt"})
+        mock_collection.get.return_value = {'ids': [store._generate_doc_id(old)]}
+        
+        store.add([old, new, new], [[0.1, 0.2], [0.3, 0.4], [0.3, 0.4]])
+        
+        call_args = mock_collection.upsert.call_args[1]
+        assert call_args['documents'] == ["New"]
+        np.testing.assert_allclose(call_args['embeddings'], [[0.3, 0.4]], rtol=1e-6)
+        assert call_args['ids'] == [store._generate_doc_id(new)]
+    
+    def test_add_all_existing_skips_upsert(self, mock_chroma_client):
+        """Test that nothing is written when every document already exists."""
+        _, mock_collection = mock_chroma_client
+        
+        store = ChromaVectorStore()
+        doc = Documento(content="Same", metadata={"path": "/a.txt"})
+        mock_collection.get.return_value = {'ids': [store._generate_doc_id(doc)]}
+        
+        store.add([doc], [[0.1, 0.2]])
+        
+        mock_collection.upsert.assert_not_called()
+    
+    def test_missing_documents(self, mock_chroma_client):
+        """Test that only documents absent from the collection are returned, once each."""
+        _, mock_collection = mock_chroma_client
+        
+        store = ChromaVectorStore()
+        old = Documento(content="Old", metadata={"path": "/a.txt"})
+        new = Documento(content="New", metadata={"path": "/a.txt"})
+        mock_collection.get.return_value = {'ids': [store._generate_doc_id(old)]}
+        
+        assert store.missing_documents([old, new, new]) == [new]
+        assert store.missing_documents([]) == []
+    
+    def test_reingesting_edited_file_removes_old_chunks(self, mock_chroma_client):
+        """Test that chunks of a file's previous version are deleted on re-ingestion."""
+        _, mock_collection = mock_chroma_client
+        stored = {}
+        
+        def get(ids=None, where=None, include=None):
+            if where is not None:
+                return {'ids': [i for i, meta in stored.items() if meta['path'] == where['path']]}
+            return {'ids': [i for i in ids if i in stored]}
+        
+        def upsert(embeddings, documents, metadatas, ids):
+            stored.update(zip(ids, metadatas))
+        
+        def delete(ids):
+            for doc_id in ids:
+                stored.pop(doc_id)
+        
+        mock_collection.get.side_effect = get
+        mock_collection.upsert.side_effect = upsert
+        mock_collection.delete.side_effect = delete
+        store = ChromaVectorStore()
+        
+        def ingest(documents):
+            new = store.missing_documents(documents)
+            store.add(new, [[0.1, 0.2]] * len(new))
+            store.remove_stale(documents)
+        
+        kept = Documento(content="Unchanged", metadata={"path": "/a.txt"})
+        other = Documento(content="Other file", metadata={"path": "/b.txt"})
+        ingest([kept, Documento(content="Old text", metadata={"path": "/a.txt"}), other])
+        ingest([kept, Documento(content="New text", metadata={"path": "/a.txt"})])
+        
+        assert set(stored) == {
+            store._generate_doc_id(kept),
+            store._generate_doc_id(Documento(content="New text", metadata={"path": "/a.txt"})),
+            store._generate_doc_id(other),
+        }
+
+
+class TestInMemoryVectorStore:
+    """Test suite for InMemoryVectorStore."""
+    
+    def test_search_orders_by_cosine_similarity(self):
+        """Test that results come back most similar first, across add calls."""
+        store = InMemoryVectorStore()
+        store.add([Documento("x", {}), Documento("y", {})], np.array([[1.0, 0.0], [0.0, 1.0]]))
+        store.add([Documento("xy", {})], [[1.0, 1.0]])
+        
+        results = store.search(np.array([0.9, 0.1], dtype=np.float32), k=2)
+        
+        assert [doc.content for doc in results] == ["x", "xy"]
+        assert [doc.content for doc in store.search([0.0, 1.0], k=10)] == ["y", "xy", "x"]
+    
+    def test_embeddings_are_normalized_on_add(self):
+        """Test that stored rows are unit vectors and zero vectors stay zero."""
+        store = InMemoryVectorStore()
+        store.add([Documento("a", {}), Documento("zero", {})], [[3.0, 4.0], [0.0, 0.0]])
+        
+        np.testing.assert_allclose(store._embeddings(), [[0.6, 0.8], [0.0, 0.0]], rtol=1e-6)
+        assert [doc.content for doc in store.search([10.0, 0.0], k=2)] == ["a", "zero"]
+    
+    def test_partial_top_k_matches_full_sort(self):
+        """Test that the argpartition top-k matches a stable full sort."""
+        rng = np.random.default_rng(1)
+        embeddings = rng.normal(size=(500, 16)).astype(np.float32)
+        embeddings[10] = embeddings[20]  # a tie, broken by insertion order
+        documents = [Documento(str(i), {}) for i in range(len(embeddings))]
+        
+        fast = InMemoryVectorStore()
+        stable = InMemoryVectorStore(stable_ties=True)
+        for store in (fast, stable):
+            store.add(documents, embeddings)
+        
+        for query in [embeddings[10]] + list(rng.normal(size=(10, 16))):
+            expected = [doc.content for doc in stable.search(query, k=7)]
+            assert [doc.content for doc in fast.search(query, k=7)] == expected
+        assert [doc.content for doc in fast.search(embeddings[10], k=2)] == ["10", "20"]
+    
+    def test_search_with_scores(self):
+        """Test that scores are cosine similarities in result order."""
+        store = InMemoryVectorStore()
+        store.add([Documento("x", {}), Documento("y", {})], [[1.0, 0.0], [0.0, 2.0]])
+        
+        result = store.search_with_scores([1.0, 1.0], k=2)
+        
+        assert [doc.content for doc in result.documents] == ["x", "y"]
+        np.testing.assert_allclose(result.scores, [2 ** -0.5, 2 ** -0.5], rtol=1e-6)
+        assert len(store.search_with_scores([1.0, 1.0], k=0)) == 0
+    
+    def test_empty_store_and_mismatched_add(self):
+        """Test searching an empty store and adding mismatched embeddings."""
+        store = InMemoryVectorStore()
+        
+        assert store.search([1.0, 0.0], k=3) == []
+        with pytest.raises(ValueError):
+            store.add([Documento("x", {})], [[1.0, 0.0], [0.0, 1.0]])
+
+    def test_pruned_search_matches_brute_force(self):
+        """Test that prefix-bound pruning returns the same results as brute force."""
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(8, 32))
+        embeddings = (centers[rng.integers(0, 8, 2000)] + rng.normal(size=(2000, 32)) * 0.3).astype(np.float32)
+        documents = [Documento(str(i), {}) for i in range(len(embeddings))]
+        
+        brute = InMemoryVectorStore()
+        pruned = InMemoryVectorStore(prune_dims=16, prune_min_size=0)
+        for store in (brute, pruned):
+            store.add(documents[:1000], embeddings[:1000])
+            store.add(documents[1000:], embeddings[1000:])
+        
+        for query in rng.normal(size=(20, 32)):
+            query = (centers[0] + query * 0.3).astype(np.float32)
+            expected = [doc.content for doc in brute.search(query, k=5)]
+            assert [doc.content for doc in pruned.search(query, k=5)] == expected